@@ -0,0 +1,55 @@
+import argparse
+import sys
+import tempfile
+
+from benchmark.baseline import compare_results, load_baseline, save_baseline
+from benchmark.corpus import DEFAULTS, generate_corpus
+from benchmark.stages import run_stages
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time each build stage on a synthetic site.")
+    parser.add_argument("--pages", type=int, default=DEFAULTS["pages"], help="number of generated pages")
+    parser.add_argument("--blocks", type=int, default=DEFAULTS["blocks"], help="blocks per page (page size)")
+    parser.add_argument("--link-density", type=float, default=DEFAULTS["link_density"], help="share of words that are links")
+    parser.add_argument("--emphasis-density", type=float, default=DEFAULTS["emphasis_density"], help="share of words in bold, italic or code")
+    parser.add_argument("--list-ratio", type=float, default=DEFAULTS["list_ratio"], help="share of blocks that are lists")
+    parser.add_argument("--code-ratio", type=float, default=DEFAULTS["code_ratio"], help="share of blocks that are fenced code")
+    parser.add_argument("--static-files", type=int, default=DEFAULTS["static_files"], help="number of static files")
+    parser.add_argument("--static-size", type=int, default=DEFAULTS["static_size"], help="bytes per static file")
+    parser.add_argument("--seed", type=int, default=DEFAULTS["seed"], help="corpus random seed")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, the fastest is kept")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown before a stage counts as a regression")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    options = {name: getattr(args, name) for name in DEFAULTS}
+    
+    with tempfile.TemporaryDirectory() as root_dir:
+        config = generate_corpus(root_dir, **options)
+        results = run_stages(root_dir, args.repeat)
+    
+    for stage, seconds in results.items():
+        print(f"{stage:<16} {seconds * 1000:10.2f} ms")
+    
+    if args.save:
+        save_baseline(args.save, config, results)
+        print(f"Saved baseline to {args.save}")
+    
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        if baseline["config"] != config:
+            print("Warning: baseline was recorded with a different corpus configuration")
+        regressions = compare_results(baseline, results, args.threshold)
+        for stage, previous, seconds in regressions:
+            print(f"REGRESSION {stage}: {previous * 1000:.2f} ms -> {seconds * 1000:.2f} ms")
+        if regressions:
+            return 1
+        print(f"No stage slower than {args.threshold:.0%} over the baseline")
+    return 0
+    
+    
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+import json
+
+def save_baseline(path, config, results):
+    with open(path, "w") as file:
+        json.dump({"config": config, "results": results}, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+def load_baseline(path) -> dict:
+    with open(path, "r") as file:
+        return json.load(file)
+
+def compare_results(baseline, results, threshold) -> list:
+    # returns (stage, baseline seconds, current seconds) for every stage that
+    # got slower than the baseline by more than threshold (0.1 == 10%)
+    regressions = []
+    for stage, seconds in results.items():
+        previous = baseline["results"].get(stage)
+        if previous is not None and seconds > previous * (1 + threshold):
+            regressions.append((stage, previous, seconds))
+    return regressions
@@ -0,0 +1,106 @@
+import os
+import random
+
+WORDS = (
+    "ring shire hobbit wizard elf river mountain road shadow tower song "
+    "forest king ranger dwarf gate bridge lantern council journey legend "
+    "ancient silver riddle harbour valley watch fire stone star sword"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+DEFAULTS = {
+    "pages": 200,
+    "blocks": 40,
+    "link_density": 0.05,
+    "emphasis_density": 0.08,
+    "list_ratio": 0.2,
+    "code_ratio": 0.1,
+    "static_files": 50,
+    "static_size": 16384,
+    "seed": 1,
+}
+
+def generate_corpus(root_dir, **options) -> dict:
+    # Writes content/, static/ and template.html under root_dir. The same
+    # options always produce byte-identical files, so timings stay comparable
+    # between runs and machines.
+    config = {**DEFAULTS, **options}
+    rng = random.Random(config["seed"])
+    content_dir = os.path.join(root_dir, "content")
+    static_dir = os.path.join(root_dir, "static")
+
+    for index in range(config["pages"]):
+        section = f"section{index % 10}"
+        page_path = os.path.join(content_dir, section, f"page{index}", "index.md")
+        write_text(page_path, generate_page(rng, index, config))
+    write_text(os.path.join(content_dir, "index.md"), generate_page(rng, -1, config))
+
+    for index in range(config["static_files"]):
+        static_path = os.path.join(static_dir, "images", f"image{index}.bin")
+        write_bytes(static_path, rng.randbytes(config["static_size"]))
+    write_text(os.path.join(static_dir, "index.css"), "body { margin: 0 auto; max-width: 50em; }\n")
+
+    write_text(os.path.join(root_dir, "template.html"), TEMPLATE)
+    return config
+
+def generate_page(rng, index, config) -> str:
+    blocks = [f"# Page {index}"]
+    for _ in range(config["blocks"]):
+        roll = rng.random()
+        if roll < config["code_ratio"]:
+            blocks.append(generate_code_block(rng))
+        elif roll < config["code_ratio"] + config["list_ratio"]:
+            blocks.append(generate_list(rng, config))
+        elif roll < config["code_ratio"] + config["list_ratio"] + 0.1:
+            blocks.append(f"## {sentence(rng, config, 4)}")
+        else:
+            lines = [sentence(rng, config, rng.randint(8, 20)) for _ in range(rng.randint(1, 4))]
+            blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
+
+def generate_list(rng, config) -> str:
+    ordered = rng.random() < 0.5
+    items = []
+    for number in range(1, rng.randint(2, 8) + 1):
+        marker = f"{number}." if ordered else "-"
+        items.append(f"{marker} {sentence(rng, config, rng.randint(3, 10))}")
+    return "\n".join(items)
+
+def generate_code_block(rng) -> str:
+    lines = [f"{rng.choice(WORDS)} = {rng.randint(0, 999)}" for _ in range(rng.randint(2, 12))]
+    return "```\n" + "\n".join(lines) + "\n```"
+
+def sentence(rng, config, length) -> str:
+    words = []
+    for _ in range(length):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < config["link_density"]:
+            word = f"[{word}](/{rng.choice(WORDS)}/{rng.randint(0, 99)})"
+        elif roll < config["link_density"] + config["emphasis_density"]:
+            word = rng.choice((f"**{word}**", f"_{word}_", f"`{word}`"))
+        words.append(word)
+    return " ".join(words)
+
+def write_text(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(text)
+
+def write_bytes(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(data)
@@ -0,0 +1,72 @@
+import contextlib
+import os
+import shutil
+import time
+
+from copystatic import copy_static
+from generate_page import extract_title, find_pages
+from inline_markdown import text_to_textnodes
+from markdown_blocks import block_inline_texts, block_to_html_node, scan_blocks
+from template import compile_template
+
+STAGES = ("block_split", "inline_tokenize", "tree_build", "serialize", "write", "static_copy")
+
+def run_stages(root_dir, repeat=3) -> dict:
+    # Times every stage in isolation on the corpus under root_dir and keeps
+    # the fastest of `repeat` runs, which is the least noisy estimate.
+    pages = find_pages(os.path.join(root_dir, "content"), os.path.join(root_dir, "out"))
+    sources = []
+    for source_path, _ in pages:
+        with open(source_path, "r") as file:
+            sources.append(file.read())
+
+    blocks = [list(scan_blocks(markdown.split("\n"))) for markdown in sources]
+    inline_texts = [text for page_blocks in blocks for block_type, lines in page_blocks for text in block_inline_texts(block_type, lines)]
+    trees = [[block_to_html_node(block_type, lines) for block_type, lines in page_blocks] for page_blocks in blocks]
+    template = compile_template(os.path.join(root_dir, "template.html"))
+    rendered = [
+        template.render({"Title": extract_title(markdown), "Content": "".join(node.to_html() for node in tree)})
+        for markdown, tree in zip(sources, trees)
+    ]
+    out_dir = os.path.join(root_dir, "out")
+
+    stages = {
+        "block_split": lambda: [list(scan_blocks(markdown.split("\n"))) for markdown in sources],
+        "inline_tokenize": lambda: [text_to_textnodes(text) for text in inline_texts],
+        "tree_build": lambda: [[block_to_html_node(block_type, lines) for block_type, lines in page_blocks] for page_blocks in blocks],
+        "serialize": lambda: [[node.to_html() for node in tree] for tree in trees],
+        "write": lambda: write_pages(pages, rendered, out_dir),
+        "static_copy": lambda: quietly(copy_static, os.path.join(root_dir, "static"), os.path.join(out_dir, "static")),
+    }
+    results = {}
+    try:
+        for name in STAGES:
+            results[name] = best_time(stages[name], repeat)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return results
+
+def best_time(func, repeat) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def quietly(func, *args):
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return func(*args)
+
+def write_pages(pages, rendered, out_dir):
+    # write into a fresh directory every run so each repeat measures the same
+    # create-and-write work rather than overwriting the previous run's files
+    pages_dir = os.path.join(out_dir, "pages")
+    shutil.rmtree(pages_dir, ignore_errors=True)
+    for (_, dest_file), page_content in zip(pages, rendered):
+        dest_file = os.path.join(pages_dir, os.path.relpath(dest_file, out_dir))
+        os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+        with open(dest_file, "w") as file:
+            file.write(page_content)
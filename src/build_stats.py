@@ -0,0 +1,22 @@
+from collections import Counter
+
+# Build-wide counters filled while pages render. Pool workers hand theirs to
+# the parent with drain(), which adds them back in with merge().
+_counters = Counter()
+
+def add(name, amount=1):
+    _counters[name] += amount
+
+def get(name) -> int:
+    return _counters[name]
+
+def drain() -> dict:
+    counters = dict(_counters)
+    _counters.clear()
+    return counters
+
+def merge(counters):
+    _counters.update(counters)
+
+def reset():
+    _counters.clear()
@@ -0,0 +1,100 @@
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from manifest import MANIFEST_NAME, hash_file, load_manifest, remove_output, save_manifest
+from staging import atomic_open
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt", ".xml")
+MIN_SIZE = 1024
+
+def compress_gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output identical between builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def compress_zstd(data: bytes) -> bytes:
+    return zstd.compress(data, level=zstd.CompressionParameter.compression_level.bounds()[1])
+
+CODECS = [(".gz", compress_gzip)]
+if zstd is not None:
+    CODECS.append((".zst", compress_zstd))
+
+def precompress(dest_dir="docs", jobs=1, min_size=MIN_SIZE) -> dict:
+    # Writes a compressed sibling per codec (index.html.gz, ...) next to every
+    # text output. The "compressed" manifest section remembers which source
+    # bytes each sibling was made from, so unchanged outputs are skipped.
+    manifest = load_manifest(dest_dir)
+    previous = manifest.get("compressed", {})
+    entries = {}
+    pending = []
+    skipped = 0
+
+    for path, relative_path in find_compressible(dest_dir):
+        stat = os.stat(path)
+        if stat.st_size < min_size:
+            continue
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        previous_entry = previous.get(relative_path)
+        if previous_entry and previous_entry["size"] == entry["size"] and previous_entry["mtime_ns"] == entry["mtime_ns"]:
+            entry["hash"] = previous_entry["hash"]
+        else:
+            entry["hash"] = hash_file(path)
+        entries[relative_path] = entry
+        if previous_entry and previous_entry["hash"] == entry["hash"] and has_siblings(path):
+            skipped += 1
+        else:
+            pending.append(path)
+
+    compress_files(pending, jobs)
+
+    # outputs that were deleted or fell under the threshold lose their siblings
+    removed = 0
+    for relative_path in previous.keys() - entries.keys():
+        for extension, _ in CODECS:
+            if os.path.exists(os.path.join(dest_dir, relative_path + extension)):
+                remove_output(dest_dir, relative_path + extension)
+                removed += 1
+
+    manifest["compressed"] = entries
+    save_manifest(dest_dir, manifest)
+    print(f"Precompressed files: {len(pending)} compressed, {skipped} unchanged, {removed} removed")
+    return {"compressed": len(pending), "skipped": skipped, "removed": removed}
+
+def find_compressible(dest_dir) -> list:
+    files = []
+    for dirpath, _, filenames in os.walk(dest_dir):
+        for filename in sorted(filenames):
+            if filename == MANIFEST_NAME or not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, filename)
+            files.append((path, os.path.relpath(path, dest_dir)))
+    return sorted(files)
+
+def has_siblings(path) -> bool:
+    return all(os.path.exists(path + extension) for extension, _ in CODECS)
+
+def compress_file(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    for extension, compress in CODECS:
+        with atomic_open(path + extension, "wb") as file:
+            file.write(compress(data))
+
+def compress_files(paths, jobs=1):
+    if not jobs:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(paths))
+
+    if jobs <= 1:
+        for path in paths:
+            compress_file(path)
+        return
+
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        list(executor.map(compress_file, paths, chunksize=chunksize))
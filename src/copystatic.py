@@ -1,21 +1,130 @@
+import json
 import os
-import shutil
 
-def copy_static(source_dir, destination_dir="docs"):
-    if os.path.exists(destination_dir):
-        shutil.rmtree(destination_dir)
-    copy_files_recursively(source_dir, destination_dir)
+from inventory import scan_static
+from manifest import hash_file, load_manifest, save_manifest, remove_output
+from staging import atomic_copy, atomic_open, same_contents
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+FINGERPRINT_LENGTH = 8
+
+def copy_static(source_dir, destination_dir="docs", fingerprint=False, inventory=None, output=None):
+    # output is an output backend; without one the files go to destination_dir
+    files = inventory.static if inventory is not None else scan_static(source_dir, destination_dir)
+    if output is None:
+        # docs/ is kept between builds, so only files that differ are copied
+        if fingerprint:
+            sync_static(source_dir, destination_dir, use_hash=True, fingerprint=True, inventory=inventory)
+            return
+        copy_changed(files, destination_dir)
+        return
+    copy_files(files, destination_dir, output)
     
             
-def copy_files_recursively(source_dir, destination_dir):
-    if not os.path.exists(destination_dir):
-        os.mkdir(destination_dir)
+def copy_files(files, destination_dir, output):
+    for source_file in files:
+        print(f" * {source_file.path} -> {os.path.join(destination_dir, source_file.relative_path)}")
+        output.copy(source_file.path, source_file.relative_path)
+
+def copy_changed(files, destination_dir):
+    copied = 0
+    for source_file in files:
+        dest_path = os.path.join(destination_dir, source_file.relative_path)
+        if same_contents(source_file.path, dest_path):
+            continue
+        print(f" * {source_file.path} -> {dest_path}")
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        atomic_copy(source_file.path, dest_path)
+        copied += 1
+    print(f"Static files: {copied} copied, {len(files) - copied} unchanged")
+
+def sync_static(source_dir, destination_dir="docs", use_hash=False, fingerprint=False, inventory=None) -> dict:
+    manifest = load_manifest(destination_dir)
+    previous_entries = manifest.get("static", {})
+    entries = {}
+    summary = {"copied": 0, "skipped": 0, "removed": 0}
+    
+    files = inventory.static if inventory is not None else scan_static(source_dir, destination_dir)
+    for source_file in files:
+        source_path = source_file.path
+        relative_path = source_file.relative_path
+        previous_entry = previous_entries.get(relative_path)
+        entry = static_entry(source_file, previous_entry, use_hash, fingerprint)
+        entry["output"] = fingerprinted_path(relative_path, entry["hash"]) if fingerprint else relative_path
+        entries[relative_path] = entry
+        dest_path = os.path.join(destination_dir, entry["output"])
         
-    for filename in os.listdir(source_dir):
-        source_path = os.path.join(source_dir, filename)
-        dest_path = os.path.join(destination_dir, filename)
+        previous_output = previous_entry.get("output", relative_path) if previous_entry else None
+        if previous_output is not None and previous_output != entry["output"]:
+            remove_output(destination_dir, previous_output)
+        if is_unchanged(entry, previous_entry, dest_path, use_hash):
+            summary["skipped"] += 1
+            continue
         print(f" * {source_path} -> {dest_path}")
-        if os.path.isfile(source_path):
-            shutil.copy(source_path, dest_path)
-        else:
-            copy_files_recursively(source_path, dest_path)
\ No newline at end of file
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        atomic_copy(source_path, dest_path)
+        summary["copied"] += 1
+        
+    for relative_path in sorted(previous_entries):
+        if relative_path not in entries:
+            previous_output = previous_entries[relative_path].get("output", relative_path)
+            print(f" * removing {os.path.join(destination_dir, previous_output)}")
+            remove_output(destination_dir, previous_output)
+            summary["removed"] += 1
+            
+    manifest["static"] = entries
+    save_manifest(destination_dir, manifest)
+    if fingerprint:
+        write_asset_manifest(destination_dir, entries)
+    elif os.path.exists(os.path.join(destination_dir, ASSET_MANIFEST_NAME)):
+        os.remove(os.path.join(destination_dir, ASSET_MANIFEST_NAME))
+    print(f"Static files: {summary['copied']} copied, {summary['skipped']} unchanged, {summary['removed']} removed")
+    return summary
+
+def static_entry(source_file, previous_entry, use_hash, fingerprint) -> dict:
+    entry = {"size": source_file.size, "mtime_ns": source_file.mtime_ns}
+    if not (use_hash or fingerprint):
+        return entry
+    if (
+        not use_hash
+        and previous_entry is not None
+        and "hash" in previous_entry
+        and previous_entry.get("size") == entry["size"]
+        and previous_entry.get("mtime_ns") == entry["mtime_ns"]
+    ):
+        # fingerprinting alone trusts size and mtime, so reuse the known hash
+        entry["hash"] = previous_entry["hash"]
+    else:
+        entry["hash"] = hash_file(source_file.path)
+    return entry
+
+def is_unchanged(entry, previous_entry, dest_path, use_hash) -> bool:
+    if previous_entry is None or not os.path.isfile(dest_path):
+        return False
+    if os.path.getsize(dest_path) != entry["size"]:
+        return False
+    if previous_entry.get("output", entry["output"]) != entry["output"]:
+        return False
+    if use_hash:
+        return previous_entry.get("hash") == entry["hash"]
+    return previous_entry.get("size") == entry["size"] and previous_entry.get("mtime_ns") == entry["mtime_ns"]
+
+def fingerprinted_path(relative_path, digest) -> str:
+    root, extension = os.path.splitext(relative_path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{extension}"
+
+def write_asset_manifest(destination_dir, entries):
+    # maps site-root URLs of the original files to their fingerprinted URLs
+    assets = {}
+    for relative_path, entry in entries.items():
+        assets["/" + relative_path.replace(os.sep, "/")] = "/" + entry["output"].replace(os.sep, "/")
+    with atomic_open(os.path.join(destination_dir, ASSET_MANIFEST_NAME)) as file:
+        json.dump(assets, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+def load_asset_manifest(destination_dir) -> dict:
+    try:
+        with open(os.path.join(destination_dir, ASSET_MANIFEST_NAME), "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
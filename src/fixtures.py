@@ -0,0 +1,30 @@
+import os
+
+# Temporary source and output trees for the tests.
+
+def write_file(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        file.write(text)
+
+def write_bytes(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(data)
+
+def read_file(path):
+    with open(path, "r") as file:
+        return file.read()
+
+def read_bytes(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+def read_tree(root):
+    # relative path -> bytes of every file below root
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            files[os.path.relpath(path, root)] = read_bytes(path)
+    return files
@@ -1,48 +1,277 @@
+import functools
 import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
 from pathlib import Path
-from markdown_blocks import markdown_to_html_node
+import build_stats
+import inline_markdown
+import linkcheck
+import profiler
+from minify import HTMLMinifier
+from profiler import span
+from markdown_blocks import markdown_to_html_node, write_markdown_html
+from inventory import scan_pages
+from manifest import hash_file, load_manifest, save_manifest, remove_output
+from render_context import RenderContext
+from staging import atomic_open, write_if_changed
+from template import clear_template_cache, extract_layout, load_template, resolve_layout, template_hash
 
-def generate_page(source_path, template_path, destination_path, basepath):
+# sources this large always take the streaming path
+STREAM_THRESHOLD = 32 * 1024 * 1024
+
+def generate_page(source_path, template_path, destination_path, basepath, stream=False, parse_cache=None, context=None, output=None):
     print(f"Generating page from {source_path} to {destination_path} using {template_path}")
-    with open(source_path, "r") as file:
-        markdown_content = file.read()
+    if context is None:
+        context = RenderContext(basepath)
+    context = context.for_page(destination_path)
+    
+    if stream or os.path.getsize(source_path) >= STREAM_THRESHOLD:
+        stream_page(source_path, template_path, destination_path, context, output)
+        return
+
+    with span("read", source_path):
+        with open(source_path, "r") as file:
+            source_text = file.read()
+    if linkcheck.is_enabled():
+        with span("collect_links", source_path):
+            linkcheck.collect_text(source_text, source_path, context.page_dir)
     
-    with open(template_path, "r") as file:
-        template_content = file.read()
+    with span("template_load", source_path):
+        layout, markdown_content = extract_layout(source_text)
+        template = load_template(resolve_layout(template_path, layout))
       
-    nodes = markdown_to_html_node(markdown_content)
-    html_nodes = nodes.to_html()
+    nodes = None
+    if parse_cache is not None:
+        with span("parse_cache", source_path):
+            nodes = parse_cache.get(markdown_content, context.page_key)
+    if nodes is None:
+        nodes = markdown_to_html_node(markdown_content, page=source_path, context=context)
+        if parse_cache is not None:
+            parse_cache.put(markdown_content, nodes, context.page_key)
     title = extract_title(markdown_content)
-    template_content = template_content.replace("{{ Title }}", title)
-    template_content = template_content.replace("{{ Content }}", html_nodes)
-    template_content = template_content.replace('href="/', f'href="{basepath}')
-    template_content = template_content.replace('src="/', f'src="{basepath}')
     
-    dirpath = os.path.dirname(destination_path)
+    with span("serialize", source_path):
+        html_nodes = nodes.to_html()
+    with span("template", source_path):
+        page_content = template.render({"Title": title, "Content": html_nodes}, context)
+        
+    with span("write", source_path):
+        write_page(destination_path, page_content, context, output)
+
+def stream_page(source_path, template_path, destination_path, context, output=None):
+    # Never holds more than one block of the page in memory: the title comes
+    # from a first pass over the file, then each block is rendered and
+    # written as soon as it is complete. Whole documents are what the parse
+    # cache stores, so it is not used here.
+    with span("template_load", source_path):
+        template = load_template(resolve_layout(template_path, read_layout(source_path)))
+    with span("title", source_path):
+        with open(source_path, "r") as file:
+            title = find_title(markdown_lines(file))
+    if linkcheck.is_enabled():
+        with span("collect_links", source_path):
+            linkcheck.collect_file(source_path, context.page_dir)
     
+    with span("stream_write", source_path):
+        with open(source_path, "r") as file, page_writer(destination_path, context, output) as write:
+            content = functools.partial(write_markdown_html, markdown_lines(file), context=context)
+            template.write(write, {"Title": title, "Content": content}, context)
+
+def make_parent_dirs(destination_path):
+    dirpath = os.path.dirname(destination_path)
     if dirpath != "" and not os.path.exists(destination_path):
         os.makedirs(dirpath, exist_ok=True)
-        
-    with open(destination_path, "w") as file:
-        file.write(template_content)
 
-def generate_page_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    content_dir = Path(dir_path_content)
+def open_page(destination_path, context, output=None):
+    if output is None:
+        make_parent_dirs(destination_path)
+        return atomic_open(destination_path, skip_unchanged=True)
+    return output.open(os.path.relpath(destination_path, context.output_root))
+
+def write_page(destination_path, page_content, context, output=None):
+    # the whole page is in memory, so it is compared with the current output
+    # directly; only streamed pages need a temporary file to compare against
+    if context.minify:
+        parts = []
+        minifier = HTMLMinifier(parts.append)
+        minifier.write(page_content)
+        close_minifier(minifier)
+        page_content = "".join(parts)
+    if output is None:
+        make_parent_dirs(destination_path)
+        write_if_changed(destination_path, page_content)
+    else:
+        output.write(os.path.relpath(destination_path, context.output_root), page_content)
+
+@contextmanager
+def page_writer(destination_path, context, output=None):
+    with open_page(destination_path, context, output) as file:
+        if not context.minify:
+            yield file.write
+            return
+        minifier = HTMLMinifier(file.write)
+        yield minifier.write
+        close_minifier(minifier)
+
+def close_minifier(minifier):
+    minifier.close()
+    build_stats.add("minify_bytes_in", minifier.bytes_in)
+    build_stats.add("minify_bytes_out", minifier.bytes_out)
+
+def generate_page_task(source_path, template_path, destination_path, basepath, stream, parse_cache, context, output, profile, memo_entries, check_links):
+    # pool entry point; a worker sends its counters, its events when
+    # profiling and its references when checking links back to the parent
+    if profile:
+        profiler.enable()
+    if check_links:
+        # a forked worker starts with a copy of the parent's references
+        linkcheck.enable()
+    # the inline memo lives for the whole worker, so later pages reuse it
+    if memo_entries and inline_markdown.memo_size() != memo_entries:
+        inline_markdown.enable_memo(memo_entries)
+    generate_page(source_path, template_path, destination_path, basepath, stream, parse_cache, context, output)
+    return profiler.drain() if profile else None, build_stats.drain(), linkcheck.drain() if check_links else None
+
+def generate_page_recursive(dir_path_content, template_path, dest_dir_path, basepath, incremental=False, jobs=1, stream=False, parse_cache=None, context=None, inventory=None, output=None):
+    if context is None:
+        context = RenderContext(basepath, output_root=dest_dir_path)
     dest_dir = Path(dest_dir_path)
-    dest_dir.mkdir(parents=True, exist_ok=True)
+    if output is None:
+        dest_dir.mkdir(parents=True, exist_ok=True)
+    clear_template_cache()
+    
+    if inventory is None:
+        pages = find_pages(dir_path_content, dest_dir_path)
+    else:
+        pages = page_pairs(inventory.pages)
+    if incremental:
+        manifest = load_manifest(dest_dir_path)
+        page_entries = build_page_entries(pages, dir_path_content, template_path, dest_dir_path, context)
+        stale_pages = find_stale_pages(pages, page_entries, manifest.get("pages", {}), dest_dir_path)
+        for relative_output in find_removed_outputs(page_entries, manifest.get("pages", {})):
+            print(f"Removing {dest_dir / relative_output} (source deleted)")
+            remove_output(dest_dir_path, relative_output)
+        print(f"{len(pages) - len(stale_pages)} of {len(pages)} pages up to date")
+        stale = set(stale_pages)
+        up_to_date = [page for page in pages if page not in stale]
+        pages = stale_pages
         
-    for path in content_dir.iterdir():
-        if path.is_file() and path.suffix == ".md":
-            dest_file = dest_dir / (path.stem + ".html")
-            generate_page(path, template_path, dest_file, basepath)
-        if path.is_dir():
-            dest_subdir = dest_dir / path.name
-            generate_page_recursive(path, template_path, dest_subdir, basepath)
+    generate_pages(pages, template_path, basepath, jobs, stream, parse_cache, context, output)
+    
+    if incremental and linkcheck.is_enabled():
+        # up to date pages aren't rendered, so their references are read here
+        collect_page_links(up_to_date, context)
+    
+    if parse_cache is not None:
+        parse_cache.evict()
+        
+    if incremental:
+        manifest["pages"] = page_entries
+        save_manifest(dest_dir_path, manifest)
+    elif output is None:
+        # these pages were written without being recorded, so an incremental
+        # build must not trust what an earlier one recorded about them
+        manifest = load_manifest(dest_dir_path)
+        if manifest.pop("pages", None) is not None:
+            save_manifest(dest_dir_path, manifest)
+
+def generate_pages(pages, template_path, basepath, jobs=1, stream=False, parse_cache=None, context=None, output=None):
+    if not jobs:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(pages))
+    if output is not None and not output.parallel:
+        # the backend lives in this process, so the pages are rendered here
+        jobs = 1
+    
+    if jobs <= 1:
+        for source_path, dest_file in pages:
+            generate_page(source_path, template_path, dest_file, basepath, stream, parse_cache, context, output)
+        return
+    
+    # every page is independent, so the workers only need the page paths;
+    # chunking keeps the per-task pickling overhead low on large sites
+    sources = [source_path for source_path, _ in pages]
+    dests = [dest_file for _, dest_file in pages]
+    chunksize = max(1, len(pages) // (jobs * 4))
+    profile = profiler.is_enabled()
+    memo_entries = inline_markdown.memo_size()
+    check_links = linkcheck.is_enabled()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for events, counters, refs in executor.map(generate_page_task, sources, repeat(template_path), dests, repeat(basepath), repeat(stream), repeat(parse_cache), repeat(context), repeat(output), repeat(profile), repeat(memo_entries), repeat(check_links), chunksize=chunksize):
+            if events:
+                profiler.extend(events)
+            build_stats.merge(counters)
+            if refs:
+                linkcheck.extend(refs)
+
+def collect_page_links(pages, context):
+    for source_path, dest_file in pages:
+        linkcheck.collect_file(source_path, context.for_page(dest_file).page_dir)
+
+def find_pages(dir_path_content, dest_dir_path) -> list:
+    return page_pairs(scan_pages(dir_path_content, dest_dir_path))
+
+def page_pairs(pages) -> list:
+    return [(Path(page.path), Path(page.output_path)) for page in pages]
+
+def build_page_entries(pages, dir_path_content, template_path, dest_dir_path, context) -> dict:
+    template_hashes = {}
+    entries = {}
+    for source_path, dest_file in pages:
+        page_template = resolve_layout(template_path, read_layout(source_path))
+        if page_template not in template_hashes:
+            template_hashes[page_template] = template_hash(page_template)
+        source_key = Path(source_path).relative_to(dir_path_content).as_posix()
+        entries[source_key] = {
+            "output": Path(dest_file).relative_to(dest_dir_path).as_posix(),
+            "source_hash": hash_file(source_path),
+            "template_hash": template_hashes[page_template],
+            "context": context.fingerprint(),
+        }
+    return entries
+
+def read_layout(source_path):
+    with open(source_path, "r") as file:
+        first_line = file.readline()
+    layout, _ = extract_layout(first_line)
+    return layout
+
+def find_stale_pages(pages, page_entries, previous_entries, dest_dir_path) -> list:
+    stale_pages = []
+    for (source_path, dest_file), (source_key, entry) in zip(pages, page_entries.items()):
+        if previous_entries.get(source_key) != entry or not os.path.exists(dest_file):
+            stale_pages.append((source_path, dest_file))
+    return stale_pages
+
+def find_removed_outputs(page_entries, previous_entries) -> list:
+    current_outputs = {entry["output"] for entry in page_entries.values()}
+    removed = []
+    for source_key, entry in previous_entries.items():
+        output = entry.get("output")
+        if source_key not in page_entries and output and output not in current_outputs:
+            removed.append(output)
+    return sorted(removed)
        
 def extract_title(markdown: str) -> str:    
-    lines = markdown.split("\n")
+    return find_title(markdown.split("\n"))
+
+def find_title(lines) -> str:
     for line in lines:
         if line.startswith("# "):
             line = line[1:].strip()
             return line
-    raise Exception("Error no title found in markdown provided")
\ No newline at end of file
+    raise Exception("Error no title found in markdown provided")
+
+def markdown_lines(file):
+    # yields what extract_layout() and split("\n") would give for the whole
+    # file, one line at a time
+    line = ""
+    for index, line in enumerate(file):
+        if index == 0:
+            layout, line = extract_layout(line)
+            if layout is not None and line == "":
+                continue
+        yield line[:-1] if line.endswith("\n") else line
+    if line == "" or line.endswith("\n"):
+        yield ""
\ No newline at end of file
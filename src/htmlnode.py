@@ -1,50 +1,63 @@
+import sys
+
 class HTMLNode:
+    # one node exists per inline span of every page, so keep instances
+    # dict-free; a missing props is stored as the shared None, not a new {}
+    __slots__ = ("tag", "value", "children", "props")
+    
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        self.tag = sys.intern(tag) if type(tag) is str else tag
         self.value = value
         self.children = children
         self.props = props
         
     def to_html(self):
+        parts = []
+        self.write_html(parts.append)
+        return "".join(parts)
+    
+    def write_html(self, write):
+        # write is any callable taking a str fragment, e.g. list.append or file.write
         raise NotImplementedError
     
     def props_to_html(self):
         if not self.props:
             return ""
-        formatted_str = ""
-        for key, value in self.props.items():
-            formatted_str += f' {key}="{value}"'
-        return formatted_str
+        return "".join([f' {key}="{value}"' for key, value in self.props.items()])
             
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
     
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
     
-    def to_html(self):
+    def write_html(self, write):
         if self.value is None:
             raise ValueError("All LeafNodes must have a value")
         if self.tag is None:
-            return f"{self.value}"
+            write(f"{self.value}")
+            return
         
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        write(f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>")
         
             
 class ParentNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
         
-    def to_html(self):
+    def write_html(self, write):
         if self.tag is None:
             raise ValueError("All ParentNodes must have a tag")
         if self.children is None:
             raise ValueError("All ParentNodes must have children")
         
-        inner_html = ""
+        write(f"<{self.tag}{self.props_to_html()}>")
         for child in self.children:
-            inner_html += child.to_html()
-        
-        return f'<{self.tag}{self.props_to_html()}>{inner_html}</{self.tag}>'
\ No newline at end of file
+            child.write_html(write)
+        write(f"</{self.tag}>")
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import struct
+
+from inventory import scan_static
+from manifest import hash_file
+
+CACHE_PATH = os.path.join(".cache", "images.json")
+IMAGE_EXTENSIONS = (".png", ".gif", ".jpg", ".jpeg")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def read_image_size(path):
+    # Reads just enough of the file header to find the dimensions; returns
+    # (width, height) or None for formats we don't understand.
+    with open(path, "rb") as file:
+        header = file.read(26)
+        if header.startswith(PNG_SIGNATURE) and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+        if header.startswith(b"\xff\xd8"):
+            file.seek(2)
+            return read_jpeg_size(file)
+    return None
+
+def read_jpeg_size(file):
+    while True:
+        byte = file.read(1)
+        while byte and byte != b"\xff":
+            byte = file.read(1)
+        marker = file.read(1)
+        while marker == b"\xff":
+            marker = file.read(1)
+        if not marker:
+            return None
+        code = marker[0]
+        # markers without a length field
+        if code == 0x01 or 0xD0 <= code <= 0xD8:
+            continue
+        if code == 0xD9:
+            return None
+        length_bytes = file.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        # every start-of-frame marker except DHT, JPG and DAC carries the size
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            frame = file.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        file.seek(length - 2, 1)
+
+
+class ImageMetadata:
+    # Dimensions of every image under static_dir, keyed by site-root URL.
+    # The on-disk cache maps file hashes to sizes, plus the size/mtime a
+    # path had when it was hashed, so unchanged images cost one stat call.
+    def __init__(self, static_dir, cache_path=CACHE_PATH):
+        self.static_dir = static_dir
+        self.cache_path = cache_path
+        self.sizes = {}
+        # site-root URLs of every static file, images or not
+        self.static_urls = set()
+        # identifies sizes in RenderContext.fingerprint(), updated by scan()
+        self.digest = sizes_digest(self.sizes)
+
+    def scan(self, static_files=None):
+        # static_files is the build inventory's list, scanned here if missing
+        if static_files is None:
+            static_files = scan_static(self.static_dir, "")
+        cache = self.load_cache()
+        self.sizes = {}
+        self.static_urls = set()
+        files = {}
+        dimensions = {}
+        for source_file in static_files:
+            relative_path = source_file.relative_path
+            self.static_urls.add("/" + relative_path.replace(os.sep, "/"))
+            if not relative_path.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            known = cache["files"].get(relative_path)
+            if known and known["size"] == source_file.size and known["mtime_ns"] == source_file.mtime_ns:
+                digest = known["hash"]
+            else:
+                digest = hash_file(source_file.path)
+            size = cache["dimensions"].get(digest)
+            if size is None:
+                size = read_image_size(source_file.path)
+            files[relative_path] = {"size": source_file.size, "mtime_ns": source_file.mtime_ns, "hash": digest}
+            dimensions[digest] = size
+            if size is not None:
+                self.sizes["/" + relative_path.replace(os.sep, "/")] = tuple(size)
+        self.digest = sizes_digest(self.sizes)
+        self.save_cache({"files": files, "dimensions": dimensions})
+
+    def load_cache(self) -> dict:
+        try:
+            with open(self.cache_path, "r") as file:
+                cache = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"files": {}, "dimensions": {}}
+        cache.setdefault("files", {})
+        cache.setdefault("dimensions", {})
+        return cache
+
+    def save_cache(self, cache):
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        with open(self.cache_path, "w") as file:
+            json.dump(cache, file, sort_keys=True)
+
+    def image_props(self, url: str) -> dict:
+        props = {}
+        if url.startswith("/") and not url.startswith("//"):
+            path = url.split("?", 1)[0].split("#", 1)[0]
+            size = self.sizes.get(path)
+            if size is not None:
+                props["width"] = str(size[0])
+                props["height"] = str(size[1])
+        props["loading"] = "lazy"
+        props["decoding"] = "async"
+        return props
+
+    def report(self, urls):
+        # urls are the site-root paths of the images the pages use; this runs
+        # in the build process, so cached or pooled pages are covered too
+        for url in sorted(urls):
+            if url not in self.static_urls:
+                print(f"Warning: image {url} not found in {self.static_dir}")
+            elif url not in self.sizes:
+                print(f"Warning: image {url} has an unsupported format, its size is left out")
+
+
+def sizes_digest(sizes) -> str:
+    sizes_json = json.dumps(sorted(sizes.items())).encode()
+    return hashlib.sha256(sizes_json).hexdigest()[:16]
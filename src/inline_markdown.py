@@ -1,7 +1,20 @@
 import re
+from collections import OrderedDict
 
+import build_stats
 from textnode import TextNode, TextType, text_node_to_html_node
 
+IMAGE_RE = re.compile(r"!\[(.*?)\]\((.*?)\)")
+LINK_RE = re.compile(r"(?<!!)\[(.*?)\]\((.*?)\)")
+# same precedence as the split_nodes_delimiter passes: bold, then italic, then code
+DELIMITERS = (("**", TextType.BOLD), ("_", TextType.ITALIC), ("`", TextType.CODE))
+DEFAULT_MEMO_ENTRIES = 4096
+
+# LRU of inline text -> rendered children, None while memoizing is
+# off. Each process keeps its own, so pool workers need no coordination.
+_memo = None
+_memo_entries = 0
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
     for node in old_nodes:
@@ -21,10 +34,10 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 def extract_markdown_images(text):
-    return re.findall(r"!\[(.*?)\]\((.*?)\)", text)
+    return IMAGE_RE.findall(text)
 
 def extract_markdown_links(text):
-    return re.findall(r"(?<!!)\[(.*?)\]\((.*?)\)", text)
+    return LINK_RE.findall(text)
     
 def split_nodes_image(old_nodes):
     new_nodes = []
@@ -83,29 +96,89 @@ def split_nodes_link(old_nodes):
     return new_nodes
 
 def text_to_textnodes(text):
-    return split_nodes_delimiter(
-        split_nodes_delimiter(
-            split_nodes_delimiter(
-                split_nodes_link(
-                    split_nodes_image(
-                        [TextNode(text, TextType.TEXT)]
-                    )
-                ), 
-                "**",
-                TextType.BOLD
-            ),
-            "_", 
-            TextType.ITALIC
-        ),
-        "`", 
-        TextType.CODE
-    )
+    # Single left-to-right scan producing the same nodes as chaining
+    # split_nodes_image, split_nodes_link and the three split_nodes_delimiter
+    # passes, without rebuilding a node list per pass or re-splitting the
+    # remaining text once per link.
+    nodes = []
+    position = 0
+    for match in IMAGE_RE.finditer(text):
+        scan_links(text[position:match.start()], nodes)
+        nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+        position = match.end()
+    scan_links(text[position:], nodes)
+    return nodes
+
+def scan_links(text, nodes):
+    position = 0
+    for match in LINK_RE.finditer(text):
+        scan_delimiters(text[position:match.start()], 0, nodes)
+        nodes.append(TextNode(match.group(1), TextType.LINK, match.group(2)))
+        position = match.end()
+    scan_delimiters(text[position:], 0, nodes)
+
+def scan_delimiters(text, level, nodes):
+    if level == len(DELIMITERS):
+        if text != "":
+            nodes.append(TextNode(text, TextType.TEXT))
+        return
+    
+    delimiter, text_type = DELIMITERS[level]
+    width = len(delimiter)
+    position = 0
+    while True:
+        start = text.find(delimiter, position)
+        if start == -1:
+            scan_delimiters(text[position:], level + 1, nodes)
+            return
+        end = text.find(delimiter, start + width)
+        if end == -1:
+            raise ValueError("invalid markdown, formatted section not closed")
+        scan_delimiters(text[position:start], level + 1, nodes)
+        if end > start + width:
+            nodes.append(TextNode(text[start + width:end], text_type))
+        position = end + width
     
-def text_to_children(text: str) -> list:
+def enable_memo(max_entries=DEFAULT_MEMO_ENTRIES):
+    global _memo, _memo_entries
+    _memo = OrderedDict()
+    _memo_entries = max_entries
+
+def disable_memo():
+    global _memo, _memo_entries
+    _memo = None
+    _memo_entries = 0
+
+def memo_size() -> int:
+    # 0 while memoizing is off; pool workers are started with the parent's size
+    return _memo_entries
+
+def text_to_children(text: str, context=None) -> list:
+    if _memo is None:
+        return render_children(text, context)
+    if context is None or "](" not in text:
+        # without links or images the output does not depend on the context
+        key = text
+    else:
+        key = (text, context.page_key or context.cache_key())
+    children = _memo.get(key)
+    if children is not None:
+        _memo.move_to_end(key)
+        build_stats.add("inline_memo_hits")
+        # the nodes are never modified after rendering, only the list is fresh
+        return list(children)
+    build_stats.add("inline_memo_misses")
+    children = render_children(text, context)
+    _memo[key] = tuple(children)
+    if len(_memo) > _memo_entries:
+        _memo.popitem(last=False)
+    return children
+
+def render_children(text: str, context=None) -> list:
     children = []
     text_nodes = text_to_textnodes(text)
     for text_node in text_nodes:
-        child = text_node_to_html_node(text_node)
+        child = text_node_to_html_node(text_node, context)
         children.append(child)
     return children
     
\ No newline at end of file
@@ -0,0 +1,62 @@
+import os
+
+class SourceFile:
+    __slots__ = ("path", "relative_path", "kind", "size", "mtime_ns", "output_path")
+
+    def __init__(self, path, relative_path, kind, size, mtime_ns, output_path):
+        self.path = path
+        self.relative_path = relative_path
+        self.kind = kind
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.output_path = output_path
+
+    def __repr__(self):
+        return f"SourceFile({self.path}, {self.kind}, {self.size}, {self.mtime_ns}, {self.output_path})"
+
+
+class Inventory:
+    # Every source of a build, listed once with os.scandir so the stages
+    # don't each walk and stat content/ and static/ again. Pages are the .md
+    # files under content_dir, static files everything under static_dir;
+    # both are in the same sorted order the old directory walks produced.
+    def __init__(self, content_dir, static_dir, dest_dir):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.dest_dir = dest_dir
+        self.pages = scan_pages(content_dir, dest_dir)
+        self.static = scan_static(static_dir, dest_dir)
+
+
+def scan_tree(root, relative_dir="") -> list:
+    # (DirEntry, relative path) for every file below root; the file type
+    # comes with the directory listing, so directories cost no stat call
+    files = []
+    with os.scandir(os.path.join(root, relative_dir)) as scanner:
+        entries = sorted(scanner, key=lambda entry: entry.name)
+    for entry in entries:
+        relative_path = os.path.join(relative_dir, entry.name)
+        if entry.is_dir():
+            files.extend(scan_tree(root, relative_path))
+        elif entry.is_file():
+            files.append((entry, relative_path))
+    return files
+
+def scan_pages(content_dir, dest_dir) -> list:
+    pages = []
+    for entry, relative_path in scan_tree(content_dir):
+        root, extension = os.path.splitext(relative_path)
+        if extension != ".md":
+            continue
+        stat = entry.stat()
+        output_path = os.path.join(dest_dir, root + ".html")
+        pages.append(SourceFile(entry.path, relative_path, "page", stat.st_size, stat.st_mtime_ns, output_path))
+    return pages
+
+def scan_static(static_dir, dest_dir) -> list:
+    files = []
+    for entry, relative_path in scan_tree(static_dir):
+        stat = entry.stat()
+        output_path = os.path.join(dest_dir, relative_path)
+        files.append(SourceFile(entry.path, relative_path, "static", stat.st_size, stat.st_mtime_ns, output_path))
+    return files
@@ -0,0 +1,130 @@
+import os
+import posixpath
+from itertools import chain
+from urllib.parse import unquote
+
+from inline_markdown import text_to_textnodes
+from markdown_blocks import block_inline_texts, scan_numbered_blocks
+from render_context import SCHEME_RE, split_suffix
+from template import extract_layout
+from textnode import TextType
+
+REFERENCE_KINDS = {TextType.LINK: "link", TextType.IMAGE: "image"}
+
+# (source path, line, "link" or "image", url, page dir) for every reference
+# in the pages rendered by this process, None while checking is off. Pool
+# workers hand theirs to the parent with drain(), like build_stats.
+_refs = None
+
+def enable():
+    global _refs
+    _refs = []
+
+def disable():
+    global _refs
+    _refs = None
+
+def is_enabled() -> bool:
+    return _refs is not None
+
+def drain() -> list:
+    refs = list(_refs)
+    _refs.clear()
+    return refs
+
+def extend(refs):
+    _refs.extend(refs)
+
+def refs() -> list:
+    return list(_refs)
+
+def collect_text(source_text, source_path, page_dir):
+    # source_text is the whole page, layout line included
+    _, markdown = extract_layout(source_text)
+    first_line = 1 + source_text.count("\n", 0, len(source_text) - len(markdown))
+    collect_blocks(scan_numbered_blocks(markdown.split("\n"), first_line=first_line), source_path, page_dir)
+
+def collect_file(source_path, page_dir):
+    # reads the page one line at a time, for streamed and up to date pages
+    with open(source_path, "r") as file:
+        first = file.readline()
+        layout, rest = extract_layout(first)
+        if layout is not None and rest == "":
+            lines, first_line = file, 2
+        else:
+            lines, first_line = chain([rest], file), 1
+        lines = (line[:-1] if line.endswith("\n") else line for line in lines)
+        collect_blocks(scan_numbered_blocks(lines, first_line=first_line), source_path, page_dir)
+
+def collect_blocks(blocks, source_path, page_dir):
+    # Records the LINK and IMAGE nodes the renderer makes from each block,
+    # numbered with the block line that holds the URL, or the block's first
+    # line when no single line does.
+    source_path = str(source_path)
+    for start, block_type, lines in blocks:
+        for text in block_inline_texts(block_type, lines):
+            if "](" not in text:
+                continue
+            for node in text_to_textnodes(text):
+                if node.text_type in REFERENCE_KINDS:
+                    number = start + next((i for i, line in enumerate(lines) if "](" + node.url in line), 0)
+                    _refs.append((source_path, number, REFERENCE_KINDS[node.text_type], node.url, page_dir))
+
+def output_paths(pages, static_files, dest_dir, assets=None) -> set:
+    # site-root relative paths of everything the build produces; with
+    # fingerprinting, static files only exist under their hashed names
+    paths = {os.path.relpath(page.output_path, dest_dir).replace(os.sep, "/") for page in pages}
+    if assets:
+        paths.update(url[1:] for url in assets.values())
+    else:
+        paths.update(static.relative_path.replace(os.sep, "/") for static in static_files)
+    return paths
+
+def image_urls(refs) -> set:
+    # site-root paths of the images among refs, for ImageMetadata.report
+    urls = set()
+    for ref in refs:
+        target = target_path(ref[3], ref[4]) if ref[2] == "image" else None
+        if target:
+            urls.add("/" + target)
+    return urls
+
+def target_path(url, page_dir):
+    # the site path a reference points at, or None when it isn't checked
+    if url == "" or url.startswith(("#", "//")) or SCHEME_RE.match(url):
+        return None
+    path, _ = split_suffix(url)
+    if path == "":
+        return None
+    if not path.startswith("/"):
+        path = page_dir + path
+    path = unquote(path)
+    target = posixpath.normpath(path).lstrip("/")
+    if path.endswith("/") and target != "":
+        target += "/"
+    return target
+
+def resolves(target, paths) -> bool:
+    # the lookups a static file server makes for a path
+    if target == "" or target.endswith("/"):
+        return target + "index.html" in paths
+    return target in paths or target + "/index.html" in paths or target + ".html" in paths
+
+def find_broken(refs, paths, assets=None) -> list:
+    # assets maps references the way RenderContext.resolve_url rewrites them
+    broken = []
+    for ref in refs:
+        target = target_path(ref[3], ref[4])
+        if target is None:
+            continue
+        if assets and "/" + target in assets:
+            target = assets["/" + target][1:]
+        if not resolves(target, paths):
+            broken.append(ref)
+    broken.sort(key=lambda ref: (ref[0], ref[1]))
+    return broken
+
+def print_report(broken, checked):
+    for source_path, number, kind, url, _ in broken:
+        print(f"{source_path}:{number}: broken {kind} {url}")
+    print(f"Checked {checked} links and images: {len(broken)} broken")
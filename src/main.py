@@ -1,13 +1,328 @@
-from copystatic import copy_static
-from generate_page import generate_page_recursive
+import argparse
+import os
 import sys
 
-def main():
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+import build_stats
+import inline_markdown
+import linkcheck
+import profiler
+from compress import CODECS, MIN_SIZE, precompress
+from copystatic import ASSET_MANIFEST_NAME, copy_static, load_asset_manifest, sync_static
+from generate_page import generate_page_recursive
+from imagemeta import ImageMetadata
+from inventory import Inventory
+from manifest import MANIFEST_NAME, prune_outputs
+from output import ARCHIVE_SUFFIXES, ArchiveOutput
+from parse_cache import CACHE_DIR, DEFAULT_MAX_BYTES, ParseCache
+from render_context import RenderContext
+from shard import SHARD_MANIFEST_NAME, merge, parse_shard, partition, shard_output_dir, write_shard_manifest
+from staging import prepare_staging, swap_output
+from watch import watch
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site from content/ into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served from")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="keep docs/, sync changed static files and only regenerate pages whose source, template or basepath changed",
+    )
+    parser.add_argument(
+        "--hash-static",
+        action="store_true",
+        help="with --incremental, compare static files by content hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes used to render pages (0 uses every core)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="read, render and write each page one block at a time instead of building it in memory (always used for sources over 32 MB)",
+    )
+    parser.add_argument(
+        "--relative-urls",
+        action="store_true",
+        help="write site-root links and assets as URLs relative to each page instead of prefixing the basepath",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="copy static files under content-hashed names, rewrite references to them and write docs/asset-manifest.json",
+    )
+    parser.add_argument(
+        "--image-metadata",
+        action="store_true",
+        help="read image sizes from static/ and add width, height, loading and decoding attributes to <img> tags",
+    )
+    parser.add_argument(
+        "--inline-memo",
+        nargs="?",
+        type=int,
+        const=inline_markdown.DEFAULT_MEMO_ENTRIES,
+        metavar="ENTRIES",
+        help=f"reuse rendered inline text that repeats across pages, keeping up to ENTRIES per process (default {inline_markdown.DEFAULT_MEMO_ENTRIES})",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="minify every page while it is written: collapse whitespace, drop comments and optional quotes",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz (and .zst where available) copies of text outputs next to them, skipping unchanged files",
+    )
+    parser.add_argument(
+        "--precompress-min-size",
+        type=int,
+        default=MIN_SIZE,
+        metavar="BYTES",
+        help="leave files smaller than this uncompressed",
+    )
+    parser.add_argument(
+        "--atomic",
+        action="store_true",
+        help="build into docs.staging and swap it in at the end; with --incremental, unchanged files are hardlinked from docs/",
+    )
+    parser.add_argument(
+        "--output-archive",
+        metavar="PATH",
+        help=f"write the site straight into one archive ({', '.join(ARCHIVE_SUFFIXES)}) instead of docs/",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="render only the I-th of N deterministic slices of the pages into shards/I-of-N",
+    )
+    parser.add_argument(
+        "--shard-weighted",
+        action="store_true",
+        help="with --shard, balance the slices by source size instead of hashing paths",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        action="store_true",
+        help="check the outputs in shards/ for collisions and missing pages and combine them into docs/",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="report links and images in content/ that point at no page or static file of the build, and exit with status 1 if any do",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="build, serve docs/ locally and rebuild only what changes in content/, static/ and the templates",
+    )
+    parser.add_argument("--port", type=int, default=8888, help="port used by --watch to serve docs/")
+    parser.add_argument(
+        "--parse-cache",
+        nargs="?",
+        const=CACHE_DIR,
+        metavar="DIR",
+        help=f"reuse parsed markdown trees across builds from an on-disk cache (default {CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--parse-cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        metavar="MB",
+        help="evict least recently used parse cache entries beyond this size",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="build-trace.json",
+        metavar="TRACE",
+        help="time every stage and page, print the slowest ones and write a Chrome trace (default build-trace.json)",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive number")
+    if args.watch and args.fingerprint:
+        parser.error("--fingerprint is meant for deploy builds and cannot be combined with --watch")
+    if args.watch and args.precompress:
+        parser.error("--precompress is meant for deploy builds and cannot be combined with --watch")
+    if args.inline_memo is not None and args.inline_memo < 1:
+        parser.error("--inline-memo needs at least one entry")
+    if args.watch and args.atomic:
+        parser.error("--atomic is meant for deploy builds and cannot be combined with --watch")
+    if args.check_links and (args.watch or args.merge_shards):
+        parser.error("--check-links runs while pages render and cannot be combined with --watch or --merge-shards")
+    if args.shard is not None:
+        if args.watch or args.merge_shards:
+            parser.error("--shard cannot be combined with --watch or --merge-shards")
+        try:
+            args.shard = parse_shard(args.shard)
+        except ValueError as error:
+            parser.error(str(error))
+    elif args.shard_weighted:
+        parser.error("--shard-weighted needs --shard")
+    if args.output_archive:
+        if not args.output_archive.endswith(ARCHIVE_SUFFIXES):
+            parser.error(f"--output-archive must end in one of {', '.join(ARCHIVE_SUFFIXES)}")
+        # these options read back or rearrange files in docs/
+        for option in ("incremental", "fingerprint", "precompress", "atomic", "watch", "shard", "merge_shards"):
+            if getattr(args, option):
+                parser.error(f"--output-archive cannot be combined with --{option.replace('_', '-')}")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    context = RenderContext(args.basepath, relative=args.relative_urls, output_root="docs", minify=args.minify)
+    if args.image_metadata:
+        context.images = ImageMetadata("static")
+    
+    if args.merge_shards:
+        problems = merge()
+        for problem in problems:
+            print(f"Error: {problem}")
+        if problems:
+            sys.exit(1)
+        return
+    
+    if args.watch:
+        watch("content", "static", "template.html", "docs", args.basepath, port=args.port, context=context)
+        return
+    
+    if args.profile:
+        profiler.enable()
+    
+    output_dir = "docs"
+    if args.shard:
+        output_dir = shard_output_dir(*args.shard)
+    build_dir = output_dir
+    if args.atomic:
+        with profiler.span("stage"):
+            build_dir = prepare_staging(output_dir, link=args.incremental)
+    context.output_root = build_dir
+    
+    with profiler.span("inventory"):
+        inventory = Inventory("content", "static", build_dir)
+    all_pages = inventory.pages
+    if args.shard:
+        shard_index, shard_count = args.shard
+        inventory.pages = partition(all_pages, shard_count, args.shard_weighted)[shard_index - 1]
+        print(f"Shard {shard_index}/{shard_count}: {len(inventory.pages)} of {len(all_pages)} pages")
+    if context.images is not None:
+        context.images.scan(inventory.static)
+    
+    output = None
+    if args.output_archive:
+        output = ArchiveOutput(args.output_archive)
+    
+    with profiler.span("static"):
+        if args.incremental:
+            sync_static("static", build_dir, use_hash=args.hash_static, fingerprint=args.fingerprint, inventory=inventory)
+        else:
+            copy_static("static", build_dir, fingerprint=args.fingerprint, inventory=inventory, output=output)
+    if args.fingerprint:
+        context.assets = load_asset_manifest(build_dir)
+    
+    if args.inline_memo:
+        inline_markdown.enable_memo(args.inline_memo)
+    if args.check_links or context.images is not None:
+        # image warnings are made from the collected references as well
+        linkcheck.enable()
+    
+    parse_cache = None
+    if args.parse_cache:
+        parse_cache = ParseCache(args.parse_cache, args.parse_cache_size * 1024 * 1024)
+    
+    with profiler.span("pages"):
+        generate_page_recursive(
+            "content",
+            "template.html",
+            build_dir,
+            args.basepath,
+            incremental=args.incremental,
+            jobs=args.jobs,
+            stream=args.stream,
+            parse_cache=parse_cache,
+            context=context,
+            inventory=inventory,
+            output=output,
+        )
+    if output is not None:
+        output.close()
+    elif not args.incremental:
+        # docs/ isn't wiped before a full build, so whatever this build
+        # didn't produce is left over from an earlier one
+        for relative_path in prune_outputs(build_dir, expected_outputs(args, inventory, build_dir, context)):
+            print(f"Removing {os.path.join(build_dir, relative_path)} (no longer produced)")
+    
+    if context.images is not None:
+        context.images.report(linkcheck.image_urls(linkcheck.refs()))
+    
+    broken = []
+    if args.check_links:
+        with profiler.span("check_links"):
+            # a shard links to pages of the other shards too
+            paths = linkcheck.output_paths(all_pages, inventory.static, build_dir, context.assets)
+            refs = linkcheck.refs()
+            broken = linkcheck.find_broken(refs, paths, context.assets)
+        linkcheck.print_report(broken, len(refs))
+    
+    if args.shard:
+        write_shard_manifest(build_dir, shard_index, shard_count, all_pages, inventory.pages, args.shard_weighted)
+    
+    if output is None:
+        print_output_summary()
+    if args.inline_memo:
+        print_memo_summary()
+    if args.minify:
+        print_minify_summary()
+    
+    if args.precompress:
+        with profiler.span("compress"):
+            precompress(build_dir, jobs=args.jobs, min_size=args.precompress_min_size)
+    
+    if args.atomic:
+        with profiler.span("swap"):
+            swap_output(build_dir, output_dir)
+    
+    if args.profile:
+        events = profiler.events()
+        profiler.print_report(events)
+        profiler.write_trace(args.profile, events)
+        print(f"Wrote trace to {args.profile}")
+    
+    if broken:
+        sys.exit(1)
+    
+def expected_outputs(args, inventory, build_dir, context) -> set:
+    paths = linkcheck.output_paths(inventory.pages, inventory.static, build_dir, context.assets)
+    paths.add(MANIFEST_NAME)
+    if args.fingerprint:
+        paths.add(ASSET_MANIFEST_NAME)
+    if args.shard:
+        paths.add(SHARD_MANIFEST_NAME)
+    if args.precompress:
+        paths.update(path + extension for path in list(paths) for extension, _ in CODECS)
+    return paths
+    
+def print_output_summary():
+    written = build_stats.get("outputs_written")
+    unchanged = build_stats.get("outputs_unchanged")
+    print(f"Pages: {written} written, {unchanged} unchanged")
+    
+def print_memo_summary():
+    hits = build_stats.get("inline_memo_hits")
+    lookups = hits + build_stats.get("inline_memo_misses")
+    percent = hits * 100 / lookups if lookups else 0
+    print(f"Inline memo: {hits} of {lookups} fragments reused ({percent:.1f}%)")
     
-    copy_static("static")
-    generate_page_recursive("content", "template.html", "docs", basepath)
+def print_minify_summary():
+    bytes_in = build_stats.get("minify_bytes_in")
+    saved = bytes_in - build_stats.get("minify_bytes_out")
+    percent = saved * 100 / bytes_in if bytes_in else 0
+    print(f"Minified pages: saved {saved} of {bytes_in} bytes ({percent:.1f}%)")
     
     
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
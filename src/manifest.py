@@ -0,0 +1,58 @@
+import hashlib
+import json
+import os
+
+from staging import atomic_open
+
+MANIFEST_NAME = ".manifest.json"
+
+def hash_file(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def manifest_path(dest_dir_path) -> str:
+    return os.path.join(dest_dir_path, MANIFEST_NAME)
+
+def load_manifest(dest_dir_path) -> dict:
+    try:
+        with open(manifest_path(dest_dir_path), "r") as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if not isinstance(manifest, dict):
+        return {}
+    return manifest
+
+def save_manifest(dest_dir_path, manifest):
+    os.makedirs(dest_dir_path, exist_ok=True)
+    with atomic_open(manifest_path(dest_dir_path)) as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+def remove_output(dest_dir_path, relative_path):
+    path = os.path.join(dest_dir_path, relative_path)
+    if os.path.exists(path):
+        os.remove(path)
+    # prune directories left empty by the removal, but never the output root
+    parent = os.path.dirname(path)
+    root = os.path.abspath(dest_dir_path)
+    while os.path.abspath(parent) != root and os.path.isdir(parent) and not os.listdir(parent):
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
+
+def prune_outputs(dest_dir_path, keep) -> list:
+    # removes every file under dest_dir_path whose "/" separated relative
+    # path isn't in keep, with the directories it leaves empty
+    stale = []
+    for dirpath, _, filenames in os.walk(dest_dir_path):
+        for filename in filenames:
+            relative_path = os.path.relpath(os.path.join(dirpath, filename), dest_dir_path)
+            if relative_path.replace(os.sep, "/") not in keep:
+                stale.append(relative_path)
+    stale.sort()
+    for relative_path in stale:
+        remove_output(dest_dir_path, relative_path)
+    return stale
@@ -2,6 +2,7 @@ from enum import Enum
 from htmlnode import ParentNode
 from textnode import TextNode, TextType
 from inline_markdown import text_to_children, text_node_to_html_node
+from profiler import span
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -11,38 +12,98 @@ class BlockType(Enum):
     ULIST = "ulist"
     OLIST = "olist"
     
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+FENCE = "```"
+
 def markdown_to_blocks(markdown):
-    new_blocks = []
-    split_markdown =  markdown.split("\n\n")
-    for block in split_markdown:
-        split_block = block.strip()
+    return ["\n".join(lines) for _, lines in scan_blocks(markdown.split("\n"))]
+
+def scan_blocks(lines, fences=True):
+    for _, block_type, block_lines in scan_numbered_blocks(lines, fences):
+        yield block_type, block_lines
+
+def scan_numbered_blocks(lines, fences=True, first_line=1):
+    # Walks the lines once and yields (line number, BlockType, lines) for
+    # every block, numbered from the block's first line. Blocks are
+    # separated by empty lines, except inside a fenced code block, which
+    # runs from an opening ``` line to the next bare ``` line.
+    block = []
+    start = first_line
+    fence = None
+    for number, line in enumerate(lines, first_line):
+        if fence is not None:
+            fence.append(line)
+            if line.strip() == FENCE:
+                yield start, BlockType.CODE, trim_block(fence)
+                fence = None
+            continue
         
-        if split_block != "":
-            new_blocks.append(split_block)
+        if line == "":
+            if block:
+                yield (start, *classify_block(block))
+                block = []
+            continue
         
-    return new_blocks
+        if not block:
+            if line.strip() == "":
+                continue
+            start = number
+            if fences and opens_fence(line):
+                fence = [line]
+                continue
+        block.append(line)
+        
+    if fence is not None:
+        # an unclosed fence can never be closed later, so it is plain text
+        yield from scan_numbered_blocks(fence, fences=False, first_line=start)
+    elif block:
+        yield (start, *classify_block(block))
+
+def opens_fence(line: str) -> bool:
+    # ``` and an optional info string; a line like ```x``` more starts a
+    # paragraph with inline code instead
+    stripped = line.strip()
+    return stripped.startswith(FENCE) and "`" not in stripped[len(FENCE):]
+
+def trim_block(lines: list) -> list:
+    # blocks always start on a non-blank line; drop trailing blank ones and
+    # strip the outer edges like str.strip() on the joined block would
+    end = len(lines)
+    while lines[end - 1].strip() == "":
+        end -= 1
+    lines = lines[:end]
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return lines
+
+def classify_block(lines: list) -> tuple:
+    lines = trim_block(lines)
+    return lines_to_block_type(lines), lines
 
 def block_to_block_type(block: str) -> BlockType:
-    lines = block.split("\n")
-    if block.startswith(("# ", "## ", "### ","#### ","##### ","###### ")):
-            return BlockType.HEADING
+    return lines_to_block_type(block.split("\n"))
+
+def lines_to_block_type(lines: list) -> BlockType:
+    first_line = lines[0]
+    if first_line.startswith(HEADING_PREFIXES):
+        return BlockType.HEADING
         
-    elif len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
+    elif len(lines) > 1 and first_line.startswith(FENCE) and lines[-1].startswith(FENCE):
         return BlockType.CODE
     
-    elif block.startswith(">"):
+    elif first_line.startswith(">"):
         for line in lines:
             if not line.startswith(">"):
                 return BlockType.PARAGRAPH
         return BlockType.QUOTE
     
-    elif block.startswith("- "):
+    elif first_line.startswith("- "):
         for line in lines:
             if not line.startswith("- "):
                 return BlockType.PARAGRAPH
         return BlockType.ULIST
     
-    elif block.startswith("1. "):
+    elif first_line.startswith("1. "):
         i = 1
         for line in lines:
             if not line.startswith(f"{i}. "):
@@ -53,72 +114,91 @@ def block_to_block_type(block: str) -> BlockType:
     return BlockType.PARAGRAPH
 
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
-    block_nodes = []
-    blocks = markdown_to_blocks(markdown)
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        match block_type:
-            case BlockType.HEADING: 
-                heading_text = extract_heading_text(block)
-                level = extract_heading_level(block)
-                children = text_to_children(heading_text)
-                heading_node = ParentNode(f"h{level}", children=children)
-                block_nodes.append(heading_node)
-                
-            case BlockType.PARAGRAPH:
-                cleaned_string = extract_paragraph_text(block)
-                children = text_to_children(cleaned_string)
-                block_nodes.append(ParentNode("p", children=children))
-                
-            case BlockType.QUOTE:
-                cleaned_string = extract_quote_text(block)
-                children = text_to_children(cleaned_string)
-                block_nodes.append(ParentNode("blockquote", children=children))
+def markdown_to_html_node(markdown: str, page=None, context=None) -> ParentNode:
+    with span("block_parse", page):
+        blocks = list(scan_blocks(markdown.split("\n")))
+    # inline tokenizing dominates building the nodes for each block
+    with span("inline_parse", page):
+        block_nodes = []
+        for block_type, lines in blocks:
+            block_nodes.append(block_to_html_node(block_type, lines, context))
+    return ParentNode("div", children=block_nodes)
+
+def write_markdown_html(lines, write, context=None):
+    # streaming counterpart of markdown_to_html_node(...).write_html(write);
+    # lines can be any iterable and each block is written once complete
+    write("<div>")
+    for block_type, block_lines in scan_blocks(lines):
+        block_to_html_node(block_type, block_lines, context).write_html(write)
+    write("</div>")
+
+def block_to_html_node(block_type: BlockType, lines: list, context=None) -> ParentNode:
+    match block_type:
+        case BlockType.HEADING: 
+            level = extract_heading_level(lines)
+            heading_text = extract_heading_text(lines, level)
+            return ParentNode(f"h{level}", children=text_to_children(heading_text, context))
             
-            case BlockType.CODE:
-                cleaned_string = extract_code_text(block)
-                block_nodes.append(ParentNode("pre", [text_node_to_html_node(TextNode(cleaned_string, TextType.CODE))]))
+        case BlockType.PARAGRAPH:
+            cleaned_string = extract_paragraph_text(lines)
+            return ParentNode("p", children=text_to_children(cleaned_string, context))
             
-            case BlockType.ULIST:
-                cleaned_list_items = extract_unordered_list_text(block)
-                children = create_unordered_list_of_parentnodes(cleaned_list_items)
-                block_nodes.append(ParentNode("ul", children=children))
-                
-            case BlockType.OLIST:
-                cleaned_list_items = extract_ordered_list_item_text(block)
-                children = create_ordered_list_of_parentnodes(cleaned_list_items)
-                block_nodes.append(ParentNode("ol", children=children))
-                
-    return ParentNode("div", children=block_nodes)
+        case BlockType.QUOTE:
+            cleaned_string = extract_quote_text(lines)
+            return ParentNode("blockquote", children=text_to_children(cleaned_string, context))
+        
+        case BlockType.CODE:
+            cleaned_string = extract_code_text(lines)
+            return ParentNode("pre", [text_node_to_html_node(TextNode(cleaned_string, TextType.CODE))])
+        
+        case BlockType.ULIST:
+            cleaned_list_items = extract_unordered_list_text(lines)
+            return ParentNode("ul", children=create_unordered_list_of_parentnodes(cleaned_list_items, context))
+            
+        case BlockType.OLIST:
+            cleaned_list_items = extract_ordered_list_item_text(lines)
+            return ParentNode("ol", children=create_ordered_list_of_parentnodes(cleaned_list_items, context))
+    
+    raise ValueError(f"Invalid block type: {block_type}")
 
-def extract_paragraph_text(block: str) -> str:
+def block_inline_texts(block_type: BlockType, lines: list) -> list:
+    # the inline markdown block_to_html_node renders for a block
+    match block_type:
+        case BlockType.HEADING:
+            return [extract_heading_text(lines, extract_heading_level(lines))]
+        case BlockType.PARAGRAPH:
+            return [extract_paragraph_text(lines)]
+        case BlockType.QUOTE:
+            return [extract_quote_text(lines)]
+        case BlockType.ULIST:
+            return extract_unordered_list_text(lines)
+        case BlockType.OLIST:
+            return extract_ordered_list_item_text(lines)
+    return []
+
+def extract_paragraph_text(lines: list) -> str:
     new_items = []
-    split_block = block.split("\n")
-    for item in split_block:
+    for item in lines:
         item = item.strip()
         new_items.append(item)
     return " ".join(new_items)
 
-def extract_heading_level(block: str) -> int:
+def extract_heading_level(lines: list) -> int:
     count = 0 
-    for char in block.lstrip():
+    for char in lines[0].lstrip():
         if char != "#":
             break
         count += 1
     return min(count, 6)    
 
-def extract_heading_text(block: str) -> str:
-    level = extract_heading_level(block)
-    stripped = block.lstrip()
-    text_part = stripped[level:]
+def extract_heading_text(lines: list, level: int) -> str:
+    text_part = "\n".join(lines).lstrip()[level:]
     if text_part.startswith(" "):
         text_part = text_part[1:]
     return text_part
 
-def extract_quote_text(block: str) -> str:
+def extract_quote_text(lines: list) -> str:
     cleaned_lines = []
-    lines = block.split("\n")
     for line in lines:
         line = line.lstrip()
         if line.startswith(">"):
@@ -127,30 +207,27 @@ def extract_quote_text(block: str) -> str:
             cleaned_lines.append(line)
     return "\n".join(cleaned_lines)
                     
-def extract_code_text(block: str) -> str:   
-    lines = block.split("\n")
+def extract_code_text(lines: list) -> str:   
     inner_lines = lines[1:-1]
     return "\n".join(inner_lines) + "\n"
     
-def extract_unordered_list_text(block: str) -> list:
+def extract_unordered_list_text(lines: list) -> list:
     cleaned_lines = []
-    lines = block.split("\n")
     for line in lines:
         line = line.lstrip()
         if line.startswith("-"):
             cleaned_lines.append(f"{line[1:].lstrip()}")
     return cleaned_lines
     
-def create_unordered_list_of_parentnodes(cleaned_lines: list) -> list[ParentNode]:
+def create_unordered_list_of_parentnodes(cleaned_lines: list, context=None) -> list[ParentNode]:
     new_lines = []
     for item in cleaned_lines:
-        new_lines.append(ParentNode("li", children=text_to_children(item)))
+        new_lines.append(ParentNode("li", children=text_to_children(item, context)))
 
     return new_lines
 
-def extract_ordered_list_item_text(block: str) -> list:
+def extract_ordered_list_item_text(lines: list) -> list:
     cleaned_lines = []
-    lines = block.split("\n")
     i = 1
     for line in lines:
         if line.startswith(f"{i}. "):
@@ -158,8 +235,8 @@ def extract_ordered_list_item_text(block: str) -> list:
         i += 1
     return cleaned_lines
 
-def create_ordered_list_of_parentnodes(cleaned_lines: list) -> list[ParentNode]:
+def create_ordered_list_of_parentnodes(cleaned_lines: list, context=None) -> list[ParentNode]:
     new_lines = []
     for item in cleaned_lines:
-        new_lines.append(ParentNode("li", children=text_to_children(item)))
-    return new_lines
\ No newline at end of file
+        new_lines.append(ParentNode("li", children=text_to_children(item, context)))
+    return new_lines
@@ -0,0 +1,183 @@
+import re
+
+# whitespace next to these tags never renders, so it can be dropped entirely
+BLOCK_TAGS = frozenset((
+    "html", "head", "body", "title", "meta", "link", "script", "style",
+    "div", "p", "ul", "ol", "li", "blockquote", "pre", "hr", "br",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "footer", "main", "nav",
+    "section", "article", "aside", "table", "thead", "tbody", "tr", "td", "th",
+))
+# contents are passed through untouched up to the matching closing tag
+RAW_TAGS = frozenset(("pre", "code", "textarea", "script", "style"))
+RAW_CLOSE_RES = {name: re.compile(re.escape("</" + name), re.IGNORECASE) for name in RAW_TAGS}
+HTML_WHITESPACE = " \t\n\r\f"
+WHITESPACE_RE = re.compile(r"[ \t\n\r\f]+")
+# a complete tag; quoted attribute values may contain ">"
+TAG_RE = re.compile(r"<[^\"'>]*(?:(?:\"[^\"]*\"|'[^']*')[^\"'>]*)*>")
+TAG_NAME_RE = re.compile(r"</?([A-Za-z][^\s/>]*)")
+START_TAG_RE = re.compile(r"<([A-Za-z][^\s/>]*)((?:\s+[^\s\"'=/>]+(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s\"'=<>`]+))?)*)\s*(/?)>$")
+ATTRIBUTE_RE = re.compile(r"([^\s\"'=/>]+)(?:\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'=<>`]+)))?")
+UNQUOTED_VALUE_RE = re.compile(r"[^\s\"'=<>`]+")
+
+class HTMLMinifier:
+    # Wraps a write callable and minifies whatever is written through it.
+    # Input may arrive in arbitrary pieces; only an unfinished tag or comment
+    # is held back between calls, so memory stays bounded by the largest tag.
+    def __init__(self, write):
+        self.output = write
+        self.buffer = ""
+        self.raw = None
+        self.space = False
+        self.after_block = True
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def write(self, text):
+        self.bytes_in += len(text.encode())
+        self.buffer += text
+        self.process(False)
+
+    def close(self):
+        self.process(True)
+        self.buffer = ""
+
+    def emit(self, text):
+        if text:
+            self.bytes_out += len(text.encode())
+            self.output(text)
+
+    def process(self, final):
+        # walks the buffer with an index and drops what was consumed once at
+        # the end, so a whole page written in one call is handled in one pass
+        buffer = self.buffer
+        size = len(buffer)
+        position = 0
+        while position < size:
+            if self.raw is not None:
+                position, done = self.process_raw(buffer, position, final)
+                if not done:
+                    break
+            elif buffer.startswith("<!--", position):
+                end = buffer.find("-->", position + 4)
+                if end == -1:
+                    if not final:
+                        break
+                    end = size
+                comment = buffer[position:end + 3]
+                position = end + 3
+                # conditional comments are markup for old browsers, keep them
+                if comment.startswith("<!--["):
+                    self.emit_tag(comment, True)
+            elif buffer[position] == "<" and position + 1 == size and not final:
+                break
+            elif buffer[position] == "<" and (buffer[position + 1:position + 2].isalpha() or buffer[position + 1:position + 2] in ("/", "!")):
+                match = TAG_RE.match(buffer, position)
+                if match is None:
+                    if not final:
+                        break
+                    tag = buffer[position:]
+                else:
+                    tag = match.group()
+                position += len(tag)
+                self.process_tag(tag)
+            else:
+                end = buffer.find("<", position + 1)
+                if end == -1:
+                    end = size
+                self.process_text(buffer[position:end])
+                position = end
+        self.buffer = buffer[position:]
+        if final:
+            # trailing whitespace at the end of the document never renders
+            self.space = False
+
+    def process_raw(self, buffer, position, final) -> tuple:
+        # returns the new position and whether the closing tag was reached
+        match = RAW_CLOSE_RES[self.raw].search(buffer, position)
+        if match is None:
+            if final:
+                self.flush_space()
+                self.emit(buffer[position:])
+                return len(buffer), True
+            # hold back enough characters to recognise a split closing tag
+            keep = len(self.raw) + 1
+            if len(buffer) - position > keep:
+                self.flush_space()
+                self.emit(buffer[position:-keep])
+                position = len(buffer) - keep
+            return position, False
+        end = match.start()
+        if end > position:
+            self.flush_space()
+            self.emit(buffer[position:end])
+            self.after_block = False
+        self.raw = None
+        return end, True
+
+    def process_tag(self, tag):
+        match = TAG_NAME_RE.match(tag)
+        name = match.group(1).lower() if match else ""
+        block = name in BLOCK_TAGS or tag.startswith("<!")
+        self.emit_tag(minify_tag(tag), block)
+        if name in RAW_TAGS and not tag.startswith("</") and not tag.endswith("/>"):
+            self.raw = name
+
+    def emit_tag(self, tag, block):
+        if block:
+            self.space = False
+        else:
+            self.flush_space()
+        self.emit(tag)
+        self.after_block = block
+
+    def process_text(self, text):
+        words = [word for word in WHITESPACE_RE.split(text) if word]
+        if text[0] in HTML_WHITESPACE:
+            self.space = True
+        if not words:
+            return
+        self.flush_space()
+        self.emit(" ".join(words))
+        self.after_block = False
+        self.space = text[-1] in HTML_WHITESPACE
+
+    def flush_space(self):
+        if self.space and not self.after_block:
+            self.emit(" ")
+        self.space = False
+
+
+def minify_tag(tag: str) -> str:
+    if tag.startswith("</"):
+        return "</" + tag[2:-1].strip() + ">"
+    match = START_TAG_RE.match(tag)
+    if match is None:
+        return tag
+    name, attributes, self_closing = match.groups()
+    parts = ["<", name]
+    unquoted = False
+    for attribute in ATTRIBUTE_RE.finditer(attributes):
+        parts.append(" ")
+        parts.append(attribute.group(1))
+        unquoted = False
+        value = attribute.group(2)
+        if value is None:
+            value = attribute.group(3)
+        if value is None:
+            value = attribute.group(4)
+        if value is None:
+            continue
+        parts.append("=")
+        # a value may only lose its quotes if it cannot end the tag early
+        if UNQUOTED_VALUE_RE.fullmatch(value) and not value.endswith("/"):
+            parts.append(value)
+            unquoted = True
+        elif '"' in value:
+            parts.append("'" + value + "'")
+        else:
+            parts.append('"' + value + '"')
+    if self_closing:
+        # "a=b/>" would read the slash as part of the value
+        parts.append(" /" if unquoted else "/")
+    parts.append(">")
+    return "".join(parts)
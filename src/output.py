@@ -0,0 +1,150 @@
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from contextlib import contextmanager
+
+from staging import atomic_copy, atomic_open, write_if_changed
+
+# 1980-01-01 UTC, the earliest time a zip entry can carry
+ARCHIVE_MTIME = 315532800
+# pages larger than this are spooled to a temporary file before archiving
+SPOOL_SIZE = 8 * 1024 * 1024
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".zip")
+
+# Where generate_page and copy_static put the files of a build. Every
+# backend takes paths relative to the site root and offers open() for text
+# written by the build in pieces, write() for a page complete in memory and
+# copy() for files taken over as they are.
+# Backends that can't be shared with pool workers set parallel = False.
+
+class FileSystemOutput:
+    parallel = True
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, relative_path) -> str:
+        return os.path.join(self.root, relative_path)
+
+    def open(self, relative_path):
+        path = self.path(relative_path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return atomic_open(path, skip_unchanged=True)
+
+    def write(self, relative_path, text):
+        path = self.path(relative_path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        write_if_changed(path, text)
+
+    def copy(self, source_path, relative_path):
+        path = self.path(relative_path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        atomic_copy(source_path, path)
+
+    def close(self):
+        pass
+
+
+class MemoryOutput:
+    parallel = False
+
+    def __init__(self):
+        # posix relative path -> bytes
+        self.files = {}
+
+    @contextmanager
+    def open(self, relative_path):
+        buffer = io.StringIO()
+        yield buffer
+        self.files[archive_name(relative_path)] = buffer.getvalue().encode()
+
+    def write(self, relative_path, text):
+        self.files[archive_name(relative_path)] = text.encode()
+
+    def copy(self, source_path, relative_path):
+        with open(source_path, "rb") as file:
+            self.files[archive_name(relative_path)] = file.read()
+
+    def close(self):
+        pass
+
+
+class ArchiveOutput:
+    # Streams the site into one .tar, .tar.gz/.tgz or .zip file. Entries go
+    # in the order the build writes them, which is the sorted inventory
+    # order, and carry fixed timestamps, owners and permissions, so the same
+    # site always produces the same archive bytes.
+    parallel = False
+
+    def __init__(self, path):
+        if not path.endswith(ARCHIVE_SUFFIXES):
+            raise ValueError(f"unsupported archive {path}, expected one of {', '.join(ARCHIVE_SUFFIXES)}")
+        self.path = path
+        self.count = 0
+        self.file = open(path, "wb")
+        self.gzip = None
+        self.tar = None
+        self.zip = None
+        if path.endswith(".zip"):
+            self.zip = zipfile.ZipFile(self.file, "w", compression=zipfile.ZIP_DEFLATED)
+        elif path.endswith((".tar.gz", ".tgz")):
+            # GzipFile keeps the timestamp out of the gzip header
+            self.gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self.file, mtime=ARCHIVE_MTIME)
+            self.tar = tarfile.open(fileobj=self.gzip, mode="w", format=tarfile.PAX_FORMAT)
+        else:
+            self.tar = tarfile.open(fileobj=self.file, mode="w", format=tarfile.PAX_FORMAT)
+
+    @contextmanager
+    def open(self, relative_path):
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+            text = io.TextIOWrapper(spool, encoding="utf-8")
+            yield text
+            text.flush()
+            size = spool.tell()
+            spool.seek(0)
+            self.add(relative_path, spool, size)
+            text.detach()
+
+    def write(self, relative_path, text):
+        data = text.encode()
+        self.add(relative_path, io.BytesIO(data), len(data))
+
+    def copy(self, source_path, relative_path):
+        with open(source_path, "rb") as file:
+            self.add(relative_path, file, os.fstat(file.fileno()).st_size)
+
+    def add(self, relative_path, fileobj, size):
+        name = archive_name(relative_path)
+        if self.zip is not None:
+            info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            with self.zip.open(info, "w", force_zip64=size > zipfile.ZIP64_LIMIT) as entry:
+                shutil.copyfileobj(fileobj, entry)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = size
+            info.mtime = ARCHIVE_MTIME
+            info.mode = 0o644
+            info.uid = info.gid = 0
+            info.uname = info.gname = ""
+            self.tar.addfile(info, fileobj)
+        self.count += 1
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+        if self.tar is not None:
+            self.tar.close()
+        if self.gzip is not None:
+            self.gzip.close()
+        self.file.close()
+        print(f"Wrote {self.count} files to {self.path}")
+
+
+def archive_name(relative_path) -> str:
+    return os.path.normpath(relative_path).replace(os.sep, "/")
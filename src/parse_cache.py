@@ -0,0 +1,104 @@
+import hashlib
+import marshal
+import os
+import sys
+
+import htmlnode
+import imagemeta
+import inline_markdown
+import markdown_blocks
+import render_context
+import textnode
+from htmlnode import LeafNode, ParentNode
+
+CACHE_DIR = os.path.join(".cache", "parse")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# bump when the on-disk layout of an entry changes
+FORMAT_VERSION = 1
+# render_context and imagemeta fill in the URLs and image sizes of the nodes
+PARSER_MODULES = (markdown_blocks, inline_markdown, textnode, htmlnode, render_context, imagemeta)
+
+_parser_version = None
+
+def parser_version() -> str:
+    # Entries are keyed by the source of every module that shapes the parsed
+    # tree, so editing the parser invalidates the cache without a manual bump.
+    global _parser_version
+    if _parser_version is None:
+        digest = hashlib.sha256(f"{FORMAT_VERSION}:{sys.version}".encode())
+        for module in PARSER_MODULES:
+            with open(module.__file__, "rb") as file:
+                digest.update(file.read())
+        _parser_version = digest.hexdigest()
+    return _parser_version
+
+def node_to_data(node) -> tuple:
+    if isinstance(node, ParentNode):
+        return (node.tag, node.props, tuple(node_to_data(child) for child in node.children))
+    return (node.tag, node.props, node.value)
+
+def data_to_node(data):
+    tag, props, payload = data
+    if isinstance(payload, tuple):
+        return ParentNode(tag, [data_to_node(child) for child in payload], props)
+    return LeafNode(tag, payload, props)
+
+
+class ParseCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, markdown: str, context_key="") -> str:
+        # context_key covers render settings baked into the tree, e.g. URL rewriting
+        digest = hashlib.sha256(parser_version().encode())
+        digest.update(context_key.encode() + b"\0")
+        digest.update(markdown.encode())
+        return digest.hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".bin")
+
+    def get(self, markdown: str, context_key=""):
+        path = self.entry_path(self.key(markdown, context_key))
+        try:
+            with open(path, "rb") as file:
+                node = data_to_node(marshal.load(file))
+        except FileNotFoundError:
+            return None
+        except (EOFError, ValueError, TypeError):
+            # truncated or foreign entry: drop it and parse again
+            os.remove(path)
+            return None
+        # the mtime doubles as the last-use time for eviction
+        os.utime(path)
+        return node
+
+    def put(self, markdown: str, node, context_key=""):
+        path = self.entry_path(self.key(markdown, context_key))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as file:
+            marshal.dump(node_to_data(node), file)
+        os.replace(temp_path, path)
+
+    def evict(self) -> int:
+        # drop least recently used entries until the cache fits in max_bytes
+        entries = []
+        total = 0
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
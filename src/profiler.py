@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+
+# None while profiling is off, so span() is a single global check
+_events = None
+
+class Span:
+    __slots__ = ("name", "page", "start")
+
+    def __init__(self, name, page):
+        self.name = name
+        self.page = page
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        _events.append((self.name, self.page, self.start, end - self.start, os.getpid(), threading.get_ident()))
+        return False
+
+
+class NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+def span(name, page=None):
+    if _events is None:
+        return NULL_SPAN
+    return Span(name, None if page is None else str(page))
+
+def enable():
+    global _events
+    _events = []
+
+def disable():
+    global _events
+    _events = None
+
+def is_enabled() -> bool:
+    return _events is not None
+
+def drain() -> list:
+    # hands the recorded events to the caller, e.g. from a pool worker back to the parent
+    events = list(_events)
+    _events.clear()
+    return events
+
+def extend(events):
+    _events.extend(events)
+
+def events() -> list:
+    return list(_events)
+
+def summarize(events, top=10) -> dict:
+    stages = {}
+    pages = {}
+    for name, page, _, duration, _, _ in events:
+        stages[name] = stages.get(name, 0) + duration
+        if page is not None:
+            pages[page] = pages.get(page, 0) + duration
+    return {
+        "stages": sorted(stages.items(), key=lambda item: item[1], reverse=True),
+        "pages": sorted(pages.items(), key=lambda item: item[1], reverse=True)[:top],
+    }
+
+def print_report(events, top=10):
+    summary = summarize(events, top)
+    print("Slowest stages:")
+    for name, duration in summary["stages"]:
+        print(f"  {duration / 1e6:10.2f} ms  {name}")
+    print(f"Slowest pages (top {top}):")
+    for page, duration in summary["pages"]:
+        print(f"  {duration / 1e6:10.2f} ms  {page}")
+
+def write_trace(path, events):
+    # Chrome trace-event format: complete ("X") events with microsecond timestamps
+    trace_events = []
+    for name, page, start, duration, pid, tid in events:
+        event = {"name": name, "cat": "build", "ph": "X", "ts": start / 1000, "dur": duration / 1000, "pid": pid, "tid": tid}
+        if page is not None:
+            event["args"] = {"page": page}
+        trace_events.append(event)
+    with open(path, "w") as file:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, file)
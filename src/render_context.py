@@ -0,0 +1,115 @@
+import copy
+import hashlib
+import json
+import os
+import posixpath
+import re
+
+# "https:", "mailto:", "data:" ... point outside the site
+SCHEME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+
+class RenderContext:
+    # Site-wide settings that decide how URLs are written while a page is
+    # rendered. for_page() returns a copy that also knows which directory the
+    # page is served from, which relative URLs need.
+    def __init__(self, basepath="/", relative=False, output_root="docs", assets=None, images=None, minify=False):
+        self.basepath = basepath
+        self.relative = relative
+        self.output_root = output_root
+        # site-root URL of a static file -> URL of its fingerprinted copy
+        self.assets = assets
+        # ImageMetadata used to size <img> tags, None leaves them as written
+        self.images = images
+        self.minify = minify
+        self.page_dir = "/"
+        # cache_key() of a page context, computed once in for_page()
+        self.page_key = None
+
+    @property
+    def assets(self) -> dict:
+        return self._assets
+
+    @assets.setter
+    def assets(self, assets):
+        # hashing the map is O(assets), so it happens once per assignment
+        # instead of once per page
+        self._assets = assets or {}
+        self._assets_digest = None
+
+    def for_page(self, destination_path):
+        # fills the site-wide digests in here, so the page copies share them
+        self.fingerprint()
+        page_context = copy.copy(self)
+        relative_dir = os.path.relpath(os.path.dirname(os.path.abspath(destination_path)), os.path.abspath(self.output_root))
+        if relative_dir == ".":
+            page_context.page_dir = "/"
+        else:
+            page_context.page_dir = "/" + relative_dir.replace(os.sep, "/") + "/"
+        page_context.page_key = page_context.cache_key()
+        return page_context
+
+    def resolve_url(self, url: str) -> str:
+        # site-root URLs are rewritten, relative ones only when they point at
+        # a fingerprinted asset; external and protocol-relative URLs are left
+        # alone
+        if url.startswith("//") or SCHEME_RE.match(url):
+            return url
+        if not url.startswith("/"):
+            return self.resolve_relative_asset(url)
+        if self.assets:
+            path, suffix = split_suffix(url)
+            url = self.assets.get(path, path) + suffix
+        if self.relative:
+            return relative_url(url, self.page_dir)
+        return self.basepath + url[1:]
+
+    def resolve_relative_asset(self, url: str) -> str:
+        # the static file only exists under its fingerprinted name, so the
+        # URL is resolved against the page and written back relative to it
+        if not self.assets:
+            return url
+        path, suffix = split_suffix(url)
+        if path == "":
+            return url
+        asset = self.assets.get(posixpath.normpath(posixpath.join(self.page_dir, path)))
+        if asset is None:
+            return url
+        return relative_url(asset, self.page_dir) + suffix
+
+    def fingerprint(self) -> str:
+        # everything outside the markdown that changes the rendered output
+        fingerprint = "relative" if self.relative else f"basepath={self.basepath}"
+        if self._assets:
+            if self._assets_digest is None:
+                assets_json = json.dumps(self._assets, sort_keys=True).encode()
+                self._assets_digest = hashlib.sha256(assets_json).hexdigest()[:16]
+            fingerprint += f":assets={self._assets_digest}"
+        if self.images is not None:
+            fingerprint += f":images={self.images.digest}"
+        if self.minify:
+            fingerprint += ":minify"
+        return fingerprint
+
+    def cache_key(self) -> str:
+        # like fingerprint(), plus the page location when URLs depend on it:
+        # relative output, or relative asset references to resolve
+        if self.relative or self._assets:
+            return f"{self.fingerprint()}:{self.page_dir}"
+        return self.fingerprint()
+
+
+def split_suffix(url: str) -> tuple:
+    # separates "/a/b?x=1#top" into ("/a/b", "?x=1#top")
+    cut = len(url)
+    for separator in ("?", "#"):
+        index = url.find(separator)
+        if index != -1:
+            cut = min(cut, index)
+    return url[:cut], url[cut:]
+
+def relative_url(url: str, page_dir: str) -> str:
+    url, suffix = split_suffix(url)
+    path = posixpath.relpath(url, page_dir)
+    if url.endswith("/") and not path.endswith("/"):
+        path = "./" if path == "." else path + "/"
+    return path + suffix
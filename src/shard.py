@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from inventory import scan_pages
+from manifest import MANIFEST_NAME, hash_file
+from staging import atomic_copy, atomic_open, prepare_staging, swap_output
+
+SHARD_DIR = "shards"
+SHARD_MANIFEST_NAME = "shard-manifest.json"
+SHARD_SPEC_RE = re.compile(r"^(\d+)/(\d+)$")
+SHARD_NAME_RE = re.compile(r"^(\d+)-of-(\d+)$")
+
+def parse_shard(spec: str) -> tuple:
+    # "2/4" is the second of four shards
+    match = SHARD_SPEC_RE.match(spec)
+    if match is None:
+        raise ValueError(f"invalid shard {spec!r}, expected i/N")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise ValueError(f"invalid shard {spec!r}, i must be between 1 and N")
+    return index, count
+
+def shard_output_dir(index, count, shard_dir=SHARD_DIR) -> str:
+    return os.path.join(shard_dir, f"{index}-of-{count}")
+
+def stable_hash(relative_path: str) -> int:
+    # independent of the machine, the Python version and PYTHONHASHSEED
+    return int(hashlib.sha256(relative_path.replace(os.sep, "/").encode()).hexdigest()[:16], 16)
+
+def partition(pages, count, weighted=False) -> list:
+    # Splits the inventory's pages into count lists. Every shard computes
+    # the same split on its own, so the build nodes need no coordination.
+    shards = [[] for _ in range(count)]
+    if not weighted:
+        for page in pages:
+            shards[stable_hash(page.relative_path) % count].append(page)
+        return shards
+    # largest pages first onto the lightest shard; ties go to the lower
+    # path and the lower shard so every node picks the same assignment
+    loads = [0] * count
+    for page in sorted(pages, key=lambda page: (-page.size, page.relative_path)):
+        index = min(range(count), key=lambda i: (loads[i], i))
+        shards[index].append(page)
+        loads[index] += page.size
+    for shard in shards:
+        shard.sort(key=lambda page: page.relative_path)
+    return shards
+
+def pages_digest(pages) -> str:
+    digest = hashlib.sha256()
+    for page in sorted(page.relative_path.replace(os.sep, "/") for page in pages):
+        digest.update(page.encode() + b"\n")
+    return digest.hexdigest()
+
+def write_shard_manifest(build_dir, index, count, all_pages, shard_pages, weighted=False):
+    manifest = {
+        "shard": index,
+        "count": count,
+        "weighted": weighted,
+        "total_pages": len(all_pages),
+        "pages_digest": pages_digest(all_pages),
+        "pages": {
+            page.relative_path.replace(os.sep, "/"): os.path.relpath(page.output_path, build_dir).replace(os.sep, "/")
+            for page in shard_pages
+        },
+    }
+    with atomic_open(os.path.join(build_dir, SHARD_MANIFEST_NAME)) as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+def load_shard_manifests(shard_dir=SHARD_DIR) -> list:
+    manifests = []
+    if not os.path.isdir(shard_dir):
+        return manifests
+    for name in sorted(os.listdir(shard_dir)):
+        path = os.path.join(shard_dir, name, SHARD_MANIFEST_NAME)
+        if SHARD_NAME_RE.match(name) and os.path.isfile(path):
+            with open(path, "r") as file:
+                manifest = json.load(file)
+            manifest["dir"] = os.path.join(shard_dir, name)
+            manifests.append(manifest)
+    return manifests
+
+def check_shards(manifests, pages) -> list:
+    # pages is the merging node's own inventory of content/
+    if not manifests:
+        return ["no shard outputs found"]
+    problems = []
+    counts = {manifest["count"] for manifest in manifests}
+    if len(counts) > 1:
+        return [f"shards from different partitions: N = {', '.join(str(count) for count in sorted(counts))}"]
+    count = counts.pop()
+    present = sorted(manifest["shard"] for manifest in manifests)
+    for index in range(1, count + 1):
+        if index not in present:
+            problems.append(f"shard {index}/{count} is missing")
+    digest = pages_digest(pages)
+    for manifest in manifests:
+        if manifest["pages_digest"] != digest:
+            problems.append(f"shard {manifest['shard']}/{count} was built from a different set of pages")
+
+    owners = {}
+    for manifest in manifests:
+        for source, output in manifest["pages"].items():
+            if output in owners:
+                problems.append(f"page {output} rendered by shards {owners[output]} and {manifest['shard']}")
+            owners[output] = manifest["shard"]
+    rendered = {source for manifest in manifests for source in manifest["pages"]}
+    for page in pages:
+        source = page.relative_path.replace(os.sep, "/")
+        if source not in rendered:
+            problems.append(f"page {source} was not rendered by any shard")
+    return problems
+
+def merge(shard_dir=SHARD_DIR, content_dir="content", dest_dir="docs") -> list:
+    # checks the shards against content_dir and swaps the merged site into
+    # dest_dir; on any problem dest_dir is left as it was
+    manifests = load_shard_manifests(shard_dir)
+    problems = check_shards(manifests, scan_pages(content_dir, dest_dir))
+    if problems:
+        return problems
+    staging_dir = prepare_staging(dest_dir)
+    problems = merge_shards(manifests, staging_dir)
+    if problems:
+        shutil.rmtree(staging_dir)
+        return problems
+    swap_output(staging_dir, dest_dir)
+    return problems
+
+def merge_shards(manifests, dest_dir) -> list:
+    # Copies every shard's output into dest_dir. Pages belong to exactly
+    # one shard; other files (static, asset manifest) are written by every
+    # shard and must be identical.
+    problems = []
+    sources = {}
+    for manifest in manifests:
+        shard_root = manifest["dir"]
+        for dirpath, _, filenames in os.walk(shard_root):
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                relative_path = os.path.relpath(path, shard_root)
+                if relative_path in (SHARD_MANIFEST_NAME, MANIFEST_NAME):
+                    continue
+                if relative_path in sources:
+                    if hash_file(sources[relative_path]) != hash_file(path):
+                        problems.append(f"{relative_path} differs between {sources[relative_path]} and {path}")
+                    continue
+                sources[relative_path] = path
+    if problems:
+        return problems
+    for relative_path, path in sorted(sources.items()):
+        dest_path = os.path.join(dest_dir, relative_path)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        atomic_copy(path, dest_path)
+    print(f"Merged {len(sources)} files from {len(manifests)} shards into {dest_dir}")
+    return problems
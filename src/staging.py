@@ -0,0 +1,122 @@
+import os
+import shutil
+from contextlib import contextmanager
+
+import build_stats
+
+STAGING_SUFFIX = ".staging"
+OLD_SUFFIX = ".old"
+
+@contextmanager
+def atomic_open(path, mode="w", skip_unchanged=False):
+    # Readers see either the old file or the complete new one. Replacing the
+    # file instead of truncating it also leaves hardlinked copies untouched.
+    # With skip_unchanged, identical output keeps the old file and its mtime
+    # and the outcome is counted as outputs_written / outputs_unchanged.
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, mode) as file:
+            yield file
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if skip_unchanged and same_contents(temp_path, path):
+        os.remove(temp_path)
+        build_stats.add("outputs_unchanged")
+        return
+    os.replace(temp_path, path)
+    if skip_unchanged:
+        build_stats.add("outputs_written")
+
+def write_if_changed(path, text):
+    # For output that is already complete in memory: it is compared with
+    # the current file before anything is written, and only a page that
+    # differs goes through a temporary file and a rename.
+    data = text.encode()
+    if has_contents(path, data):
+        build_stats.add("outputs_unchanged")
+        return
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(data)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    build_stats.add("outputs_written")
+
+def has_contents(path, data) -> bool:
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as file:
+            return file.read() == data
+    except FileNotFoundError:
+        return False
+
+def same_contents(path, other_path) -> bool:
+    try:
+        if os.path.getsize(path) != os.path.getsize(other_path):
+            return False
+        with open(path, "rb") as file, open(other_path, "rb") as other:
+            while True:
+                chunk = file.read(65536)
+                if chunk != other.read(65536):
+                    return False
+                if not chunk:
+                    return True
+    except FileNotFoundError:
+        return False
+
+def atomic_copy(source_path, dest_path):
+    temp_path = f"{dest_path}.{os.getpid()}.tmp"
+    shutil.copy2(source_path, temp_path)
+    os.replace(temp_path, dest_path)
+
+def link_tree(source_dir, dest_dir) -> int:
+    # mirrors source_dir with hardlinks, copying where linking isn't possible
+    linked = 0
+    for dirpath, _, filenames in os.walk(source_dir):
+        target_dir = os.path.join(dest_dir, os.path.relpath(dirpath, source_dir))
+        os.makedirs(target_dir, exist_ok=True)
+        for filename in filenames:
+            source_path = os.path.join(dirpath, filename)
+            target_path = os.path.join(target_dir, filename)
+            try:
+                os.link(source_path, target_path)
+                linked += 1
+            except OSError:
+                shutil.copy2(source_path, target_path)
+    return linked
+
+def prepare_staging(output_dir, link=False) -> str:
+    # The build writes into a sibling directory that replaces output_dir at
+    # the end. With link=True the stage starts as a hardlinked clone of the
+    # current output so incremental builds only write what changed.
+    staging_dir = output_dir.rstrip("/") + STAGING_SUFFIX
+    if os.path.exists(staging_dir):
+        # left behind by a build that crashed
+        shutil.rmtree(staging_dir)
+    if link and os.path.isdir(output_dir):
+        linked = link_tree(output_dir, staging_dir)
+        print(f"Staging build in {staging_dir} ({linked} files linked from {output_dir})")
+    else:
+        os.makedirs(staging_dir)
+        print(f"Staging build in {staging_dir}")
+    return staging_dir
+
+def swap_output(staging_dir, output_dir):
+    # two renames on the same filesystem; output_dir is never half-written,
+    # only briefly missing between them
+    old_dir = output_dir.rstrip("/") + OLD_SUFFIX
+    if os.path.exists(old_dir):
+        shutil.rmtree(old_dir)
+    if os.path.exists(output_dir):
+        os.rename(output_dir, old_dir)
+    os.rename(staging_dir, output_dir)
+    if os.path.exists(old_dir):
+        shutil.rmtree(old_dir)
+    print(f"Swapped {staging_dir} into {output_dir}")
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import re
+
+FIELDS = ("Title", "Content")
+TAG_RE = re.compile(r"\{\{\s*(>)?\s*([^{}\s]+)\s*\}\}")
+URL_ATTRIBUTE_RE = re.compile(r'\b(?:href|src)="(/[^"]*)"')
+LAYOUT_RE = re.compile(r"\A<!--\s*layout:\s*(\S+)\s*-->[ \t]*\n?")
+
+_template_cache = {}
+
+class Template:
+    def __init__(self, segments, fields, urls, dependencies):
+        # literal text lives in segments; fields maps a segment index to the
+        # placeholder name whose value replaces it at render time, and urls
+        # maps a segment index to a site-root URL resolved per page
+        self.segments = segments
+        self.fields = fields
+        self.urls = urls
+        self.dependencies = dependencies
+
+    def render(self, values: dict, context=None) -> str:
+        parts = self.segments.copy()
+        for index, name in self.fields:
+            parts[index] = values[name]
+        if context is not None:
+            for index, url in self.urls:
+                parts[index] = context.resolve_url(url)
+        return "".join(parts)
+
+    def write(self, write, values: dict, context=None):
+        # a field value is either a str or a callable that writes its own fragments
+        fields = dict(self.fields)
+        urls = dict(self.urls) if context is not None else {}
+        for index, segment in enumerate(self.segments):
+            name = fields.get(index)
+            if name is not None:
+                value = values[name]
+                if isinstance(value, str):
+                    write(value)
+                else:
+                    value(write)
+            elif index in urls:
+                write(context.resolve_url(urls[index]))
+            elif segment:
+                write(segment)
+
+    def __repr__(self):
+        return f"Template({self.segments}, {self.fields}, {self.urls})"
+
+
+def compile_template(template_path) -> Template:
+    segments = []
+    fields = []
+    urls = []
+    dependencies = []
+    _compile_into(template_path, segments, fields, urls, dependencies, ())
+    return Template(segments, fields, urls, dependencies)
+
+def _compile_into(template_path, segments, fields, urls, dependencies, including):
+    template_path = os.path.normpath(template_path)
+    if template_path in including:
+        raise ValueError(f"Template include cycle: {' -> '.join(including + (template_path,))}")
+    dependencies.append(template_path)
+    with open(template_path, "r") as file:
+        template_content = file.read()
+
+    position = 0
+    for match in TAG_RE.finditer(template_content):
+        is_partial, name = match.groups()
+        if not is_partial and name not in FIELDS:
+            continue
+        _append_literal(template_content[position:match.start()], segments, urls)
+        if is_partial:
+            partial_path = os.path.join(os.path.dirname(template_path), name)
+            _compile_into(partial_path, segments, fields, urls, dependencies, including + (template_path,))
+        else:
+            fields.append((len(segments), name))
+            segments.append("")
+        position = match.end()
+    _append_literal(template_content[position:], segments, urls)
+
+def _append_literal(text, segments, urls):
+    # site-root href/src values become their own segments so the page's
+    # RenderContext can resolve them without scanning the rendered page
+    position = 0
+    for match in URL_ATTRIBUTE_RE.finditer(text):
+        segments.append(text[position:match.start(1)])
+        urls.append((len(segments), match.group(1)))
+        segments.append(match.group(1))
+        position = match.end(1)
+    segments.append(text[position:])
+
+def load_template(template_path) -> Template:
+    key = os.path.abspath(template_path)
+    template = _template_cache.get(key)
+    if template is None:
+        template = compile_template(template_path)
+        _template_cache[key] = template
+    return template
+
+def clear_template_cache():
+    _template_cache.clear()
+
+def template_hash(template_path) -> str:
+    digest = hashlib.sha256()
+    for dependency in load_template(template_path).dependencies:
+        with open(dependency, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+def extract_layout(markdown: str) -> tuple:
+    match = LAYOUT_RE.match(markdown)
+    if match is None:
+        return None, markdown
+    return match.group(1), markdown[match.end():]
+
+def resolve_layout(template_path, layout):
+    if layout is None:
+        return template_path
+    return os.path.join(os.path.dirname(template_path), layout)
@@ -0,0 +1,34 @@
+import filecmp
+import os
+import tempfile
+import unittest
+
+from benchmark.baseline import compare_results
+from benchmark.corpus import generate_corpus
+from benchmark.stages import STAGES, run_stages
+
+class TestCorpus(unittest.TestCase):
+    def test_corpus_is_deterministic(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            generate_corpus(first, pages=5, static_files=2, static_size=64)
+            generate_corpus(second, pages=5, static_files=2, static_size=64)
+            page = os.path.join("content", "section1", "page1", "index.md")
+            image = os.path.join("static", "images", "image1.bin")
+            _, mismatch, errors = filecmp.cmpfiles(first, second, [page, image, "template.html"], shallow=False)
+            self.assertEqual((mismatch, errors), ([], []))
+
+    def test_run_stages_reports_every_stage(self):
+        with tempfile.TemporaryDirectory() as root_dir:
+            generate_corpus(root_dir, pages=3, blocks=5, static_files=1, static_size=16)
+            results = run_stages(root_dir, repeat=1)
+        self.assertEqual(tuple(results), STAGES)
+
+
+class TestCompareResults(unittest.TestCase):
+    def test_compare_results(self):
+        baseline = {"results": {"tree_build": 1.0, "serialize": 1.0}}
+        regressions = compare_results(baseline, {"tree_build": 1.05, "serialize": 1.5, "new_stage": 9.0}, 0.1)
+        self.assertEqual(regressions, [("serialize", 1.0, 1.5)])
+
+if __name__ == "__main__":
+    unittest.main()
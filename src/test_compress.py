@@ -0,0 +1,74 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import CODECS, compress_files, precompress
+from fixtures import write_file
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.page = os.path.join(self.dest, "blog", "index.html")
+        write_file(self.page, "<p>hello</p>" * 200)
+        write_file(os.path.join(self.dest, "index.css"), "body {}")
+        write_file(os.path.join(self.dest, "images", "a.png"), "x" * 4096)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compresses_large_text_files_only(self):
+        summary = precompress(self.dest)
+        self.assertEqual(summary, {"compressed": 1, "skipped": 0, "removed": 0})
+        with gzip.open(self.page + ".gz", "rt") as file:
+            self.assertEqual(file.read(), "<p>hello</p>" * 200)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "a.png.gz")))
+
+    def test_min_size(self):
+        summary = precompress(self.dest, min_size=1)
+        self.assertEqual(summary["compressed"], 2)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css.gz")))
+
+    def test_output_is_reproducible(self):
+        precompress(self.dest)
+        with open(self.page + ".gz", "rb") as file:
+            first = file.read()
+        compress_files([self.page])
+        with open(self.page + ".gz", "rb") as file:
+            self.assertEqual(file.read(), first)
+
+    def test_unchanged_files_are_skipped(self):
+        precompress(self.dest)
+        os.utime(self.page, (1, 1))
+        self.assertEqual(precompress(self.dest), {"compressed": 0, "skipped": 1, "removed": 0})
+
+    def test_changed_file_is_recompressed(self):
+        precompress(self.dest)
+        write_file(self.page, "<p>bye</p>" * 200)
+        self.assertEqual(precompress(self.dest)["compressed"], 1)
+        with gzip.open(self.page + ".gz", "rt") as file:
+            self.assertEqual(file.read(), "<p>bye</p>" * 200)
+
+    def test_missing_sibling_is_rewritten(self):
+        precompress(self.dest)
+        os.remove(self.page + ".gz")
+        self.assertEqual(precompress(self.dest)["compressed"], 1)
+
+    def test_deleted_output_loses_siblings(self):
+        precompress(self.dest)
+        os.remove(self.page)
+        self.assertEqual(precompress(self.dest)["removed"], len(CODECS))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+    def test_parallel_compression(self):
+        for i in range(4):
+            write_file(os.path.join(self.dest, f"page{i}.html"), f"<p>{i}</p>" * 500)
+        self.assertEqual(precompress(self.dest, jobs=2)["compressed"], 5)
+        for i in range(4):
+            with gzip.open(os.path.join(self.dest, f"page{i}.html.gz"), "rt") as file:
+                self.assertEqual(file.read(), f"<p>{i}</p>" * 500)
+
+if __name__ == "__main__":
+    unittest.main()
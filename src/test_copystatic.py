@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+
+from copystatic import copy_static, fingerprinted_path, load_asset_manifest, sync_static
+from fixtures import read_file, write_file
+from manifest import prune_outputs
+
+class TestSyncStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.static, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_first_sync_copies_everything(self):
+        summary = sync_static(self.static, self.dest)
+        self.assertEqual(summary, {"copied": 2, "skipped": 0, "removed": 0})
+        self.assertTrue(os.path.isfile(os.path.join(self.dest, "images", "a.png")))
+
+    def test_second_sync_skips_unchanged(self):
+        sync_static(self.static, self.dest)
+        summary = sync_static(self.static, self.dest)
+        self.assertEqual(summary, {"copied": 0, "skipped": 2, "removed": 0})
+
+    def test_sync_copies_changed_file(self):
+        sync_static(self.static, self.dest)
+        write_file(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        summary = sync_static(self.static, self.dest)
+        self.assertEqual(summary["copied"], 1)
+        with open(os.path.join(self.dest, "index.css")) as file:
+            self.assertEqual(file.read(), "body { margin: 0 }")
+
+    def test_sync_removes_deleted_files_only(self):
+        sync_static(self.static, self.dest)
+        write_file(os.path.join(self.dest, "index.html"), "generated page")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        summary = sync_static(self.static, self.dest)
+        self.assertEqual(summary["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_sync_with_hash_ignores_touched_files(self):
+        sync_static(self.static, self.dest, use_hash=True)
+        css = os.path.join(self.static, "index.css")
+        os.utime(css, (1, 1))
+        summary = sync_static(self.static, self.dest, use_hash=True)
+        self.assertEqual(summary, {"copied": 0, "skipped": 2, "removed": 0})
+
+    def test_sync_recopies_missing_destination(self):
+        sync_static(self.static, self.dest)
+        os.remove(os.path.join(self.dest, "index.css"))
+        summary = sync_static(self.static, self.dest)
+        self.assertEqual(summary["copied"], 1)
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path("index.css", "3f2a9c1b00"), "index.3f2a9c1b.css")
+        self.assertEqual(fingerprinted_path(os.path.join("images", "a.png"), "abcdef0123"), os.path.join("images", "a.abcdef01.png"))
+
+    def test_fingerprint_writes_hashed_files_and_manifest(self):
+        sync_static(self.static, self.dest, fingerprint=True)
+        assets = load_asset_manifest(self.dest)
+        self.assertEqual(sorted(assets), ["/images/a.png", "/index.css"])
+        self.assertRegex(assets["/index.css"], r"^/index\.[0-9a-f]{8}\.css$")
+        self.assertTrue(os.path.isfile(os.path.join(self.dest, assets["/index.css"][1:])))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    def test_fingerprint_change_replaces_old_file(self):
+        sync_static(self.static, self.dest, fingerprint=True)
+        old_css = load_asset_manifest(self.dest)["/index.css"]
+        write_file(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        sync_static(self.static, self.dest, fingerprint=True)
+        new_css = load_asset_manifest(self.dest)["/index.css"]
+        self.assertNotEqual(old_css, new_css)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, old_css[1:])))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, new_css[1:])))
+
+    def test_disabling_fingerprint_restores_plain_names(self):
+        sync_static(self.static, self.dest, fingerprint=True)
+        sync_static(self.static, self.dest)
+        self.assertEqual(load_asset_manifest(self.dest), {})
+        self.assertEqual(sorted(os.listdir(self.dest)), [".manifest.json", "images", "index.css"])
+
+
+class TestCopyStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.static, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_copies_only_changed_files(self):
+        copy_static(self.static, self.dest)
+        css = os.path.join(self.dest, "index.css")
+        png = os.path.join(self.dest, "images", "a.png")
+        os.utime(css, (1, 1))
+        os.utime(png, (1, 1))
+        write_file(os.path.join(self.static, "images", "a.png"), "new png")
+        copy_static(self.static, self.dest)
+        self.assertEqual(os.stat(css).st_mtime, 1)
+        self.assertNotEqual(os.stat(png).st_mtime, 1)
+        self.assertEqual(read_file(png), "new png")
+
+    def test_prune_outputs(self):
+        copy_static(self.static, self.dest)
+        write_file(os.path.join(self.dest, "old", "index.html"), "stale page")
+        removed = prune_outputs(self.dest, {"index.css", "images/a.png"})
+        self.assertEqual(removed, [os.path.join("old", "index.html")])
+        self.assertEqual(sorted(os.listdir(self.dest)), ["images", "index.css"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import io
+import os
+import tempfile
+import unittest
+
+import build_stats
+import generate_page
+from fixtures import read_file, write_file
+from generate_page import extract_title, find_pages, generate_page_recursive, markdown_lines
+from manifest import load_manifest
+
+TEMPLATE = "<title>{{ Title }}</title><a href=\"/\">home</a>{{ Content }}"
+
+class TestExtractTitle(unittest.TestCase):
+    def test_extract_title(self):
+        self.assertEqual(extract_title("# Hello  \n\nbody"), "Hello")
+
+    def test_extract_title_missing(self):
+        with self.assertRaises(Exception):
+            extract_title("## Not a title")
+
+
+class TestMarkdownLines(unittest.TestCase):
+    def test_matches_split(self):
+        for markdown in ("# A\n\ntext\n", "# A\n\ntext", "", "\n\n"):
+            self.assertEqual(list(markdown_lines(io.StringIO(markdown))), markdown.split("\n"))
+
+    def test_skips_layout_line(self):
+        self.assertEqual(list(markdown_lines(io.StringIO("<!-- layout: post.html -->\n# A\n"))), ["# A", ""])
+        self.assertEqual(list(markdown_lines(io.StringIO("<!-- layout: post.html -->\n"))), [""])
+
+
+class TestGeneratePageRecursive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write_file(self.template, TEMPLATE)
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nA **post**")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, basepath="/"):
+        generate_page_recursive(self.content, self.template, self.dest, basepath, incremental=True)
+
+    def test_find_pages(self):
+        pages = find_pages(self.content, self.dest)
+        self.assertEqual(
+            [(str(source), str(dest)) for source, dest in pages],
+            [
+                (os.path.join(self.content, "blog", "post", "index.md"), os.path.join(self.dest, "blog", "post", "index.html")),
+                (os.path.join(self.content, "index.md"), os.path.join(self.dest, "index.html")),
+            ],
+        )
+
+    def test_incremental_writes_manifest(self):
+        self.build()
+        manifest = load_manifest(self.dest)
+        self.assertEqual(sorted(manifest["pages"]), ["blog/post/index.md", "index.md"])
+        self.assertEqual(manifest["pages"]["index.md"]["output"], "index.html")
+        self.assertEqual(
+            read_file(os.path.join(self.dest, "blog", "post", "index.html")),
+            '<title>Post</title><a href="/">home</a><div><h1>Post</h1><p>A <b>post</b></p></div>',
+        )
+
+    def test_incremental_skips_unchanged_pages(self):
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        write_file(index_html, "untouched")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nEdited")
+        self.build()
+        self.assertEqual(read_file(index_html), "untouched")
+        self.assertIn("Edited", read_file(os.path.join(self.dest, "blog", "post", "index.html")))
+
+    def test_incremental_rebuilds_on_template_change(self):
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        write_file(index_html, "stale")
+        write_file(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.build()
+        self.assertTrue(read_file(index_html).startswith("<h1>Home</h1>"))
+
+    def test_identical_output_is_not_rewritten(self):
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        os.utime(index_html, ns=(10**9, 10**9))
+        # a different template that renders the same bytes
+        write_file(self.template, TEMPLATE.replace("{{ Content }}", "{{Content}}"))
+        build_stats.reset()
+        self.build()
+        self.assertEqual(os.stat(index_html).st_mtime_ns, 10**9)
+        self.assertEqual(build_stats.get("outputs_unchanged"), 2)
+        self.assertEqual(build_stats.get("outputs_written"), 0)
+        build_stats.reset()
+
+    def test_incremental_rebuilds_on_basepath_change(self):
+        self.build()
+        self.build("/site/")
+        self.assertIn('href="/site/"', read_file(os.path.join(self.dest, "index.html")))
+
+    def test_incremental_regenerates_missing_output(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html"))
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_incremental_removes_deleted_sources(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertEqual(sorted(load_manifest(self.dest)["pages"]), ["index.md"])
+
+    def test_layout_selected_per_page(self):
+        write_file(os.path.join(self.tmp.name, "post.html"), "<main>{{ Content }}</main>")
+        write_file(os.path.join(self.content, "index.md"), "<!-- layout: post.html -->\n# Home")
+        self.build()
+        self.assertEqual(read_file(os.path.join(self.dest, "index.html")), "<main><div><h1>Home</h1></div></main>")
+        write_file(os.path.join(self.tmp.name, "post.html"), "<section>{{ Content }}</section>")
+        self.build()
+        self.assertEqual(read_file(os.path.join(self.dest, "index.html")), "<section><div><h1>Home</h1></div></section>")
+
+    def test_stream_output_matches_buffered(self):
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n[a](/a) ![b](/b.png)\n\n```\nhref=\"/x\"\n```")
+        stream_dest = os.path.join(self.tmp.name, "streamed")
+        generate_page_recursive(self.content, self.template, self.dest, "/base/")
+        generate_page_recursive(self.content, self.template, stream_dest, "/base/", stream=True)
+        for source_path, dest_file in find_pages(self.content, self.dest):
+            streamed_file = os.path.join(stream_dest, os.path.relpath(dest_file, self.dest))
+            self.assertEqual(read_file(dest_file), read_file(streamed_file))
+
+    def test_large_sources_stream(self):
+        write_file(os.path.join(self.content, "index.md"), "<!-- layout: post.html -->\n# Home\n\n" + "text [a](/a)\n\n" * 50)
+        write_file(os.path.join(self.tmp.name, "post.html"), "<main>{{ Title }}{{ Content }}</main>")
+        generate_page_recursive(self.content, self.template, self.dest, "/base/")
+        expected = read_file(os.path.join(self.dest, "index.html"))
+        threshold = generate_page.STREAM_THRESHOLD
+        generate_page.STREAM_THRESHOLD = 0
+        try:
+            streamed_dest = os.path.join(self.tmp.name, "streamed")
+            generate_page_recursive(self.content, self.template, streamed_dest, "/base/")
+        finally:
+            generate_page.STREAM_THRESHOLD = threshold
+        self.assertEqual(read_file(os.path.join(streamed_dest, "index.html")), expected)
+
+    def test_parallel_output_matches_serial(self):
+        for i in range(6):
+            write_file(os.path.join(self.content, "notes", f"note{i}.md"), f"# Note {i}\n\n- [link](/notes/{i})\n- _item_")
+        serial_dest = os.path.join(self.tmp.name, "serial")
+        generate_page_recursive(self.content, self.template, serial_dest, "/base/")
+        generate_page_recursive(self.content, self.template, self.dest, "/base/", jobs=3)
+        for source_path, dest_file in find_pages(self.content, self.dest):
+            serial_file = os.path.join(serial_dest, os.path.relpath(dest_file, self.dest))
+            self.assertEqual(read_file(dest_file), read_file(serial_file))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
+import io
+import tracemalloc
 import unittest
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
+from render_context import RenderContext
 from textnode import TextNode, TextType, text_node_to_html_node
 
 class TestHTMLNode(unittest.TestCase):
@@ -99,6 +102,45 @@ class TestHTMLNode(unittest.TestCase):
         
         )
         
+    def test_write_html_to_list(self):
+        node = ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text")], {"class": "x"})
+        parts = []
+        node.write_html(parts.append)
+        self.assertEqual(parts, ['<p class="x">', "<b>bold</b>", " text", "</p>"])
+        
+    def test_write_html_to_stream(self):
+        node = ParentNode("div", [ParentNode("span", [LeafNode("i", "deep")])])
+        stream = io.StringIO()
+        node.write_html(stream.write)
+        self.assertEqual(stream.getvalue(), node.to_html())
+        
+    def test_deep_tree_to_html(self):
+        node = LeafNode(None, "leaf")
+        for _ in range(200):
+            node = ParentNode("span", [node])
+        self.assertEqual(node.to_html(), "<span>" * 200 + "leaf" + "</span>" * 200)
+        
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode(), LeafNode("b", "x"), ParentNode("p", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+            
+    def test_tags_are_interned(self):
+        level = 2
+        node = ParentNode(f"h{level}", [])
+        self.assertIs(node.tag, ParentNode("h" + str(level), []).tag)
+        
+    def test_leaf_node_memory(self):
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            nodes = [LeafNode("b", "x") for _ in range(10000)]
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        # a dict-backed node costs well over 150 bytes; a slotted one about 64
+        self.assertLess(allocated / len(nodes), 100)
+        
     def test_text(self):
         node = TextNode("This is a text node", TextType.TEXT)
         html_node = text_node_to_html_node(node)
@@ -142,5 +184,15 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.value, "")
         self.assertEqual(html_node.props, {"src": node.url, "alt": node.text})
         
+    def test_link_resolved_with_context(self):
+        node = TextNode("Home", TextType.LINK, "/blog/tom")
+        html_node = text_node_to_html_node(node, RenderContext("/site/"))
+        self.assertEqual(html_node.props, {"href": "/site/blog/tom"})
+        
+    def test_image_resolved_with_context(self):
+        node = TextNode("Tom", TextType.IMAGE, "/images/tom.png")
+        html_node = text_node_to_html_node(node, RenderContext("/site/"))
+        self.assertEqual(html_node.props, {"src": "/site/images/tom.png", "alt": "Tom"})
+        
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,142 @@
+import contextlib
+import io
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+import imagemeta
+import linkcheck
+from fixtures import write_bytes
+from imagemeta import ImageMetadata, read_image_size
+from render_context import RenderContext
+from textnode import TextNode, TextType, text_node_to_html_node
+
+PNG = imagemeta.PNG_SIGNATURE + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 640, 480) + b"\x08\x02\x00\x00\x00"
+GIF = b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 7
+# SOI, an APP0 segment to skip, then a baseline SOF0 frame header
+JPEG = (
+    b"\xff\xd8"
+    + b"\xff\xe0" + struct.pack(">H", 6) + b"JFIF"
+    + b"\xff\xc0" + struct.pack(">HBHH", 11, 8, 200, 300) + b"\x01\x01\x11\x00"
+)
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def size_of(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        write_bytes(path, data)
+        return read_image_size(path)
+
+    def test_png(self):
+        self.assertEqual(self.size_of("a.png", PNG), (640, 480))
+
+    def test_gif(self):
+        self.assertEqual(self.size_of("a.gif", GIF), (32, 16))
+
+    def test_jpeg(self):
+        self.assertEqual(self.size_of("a.jpg", JPEG), (300, 200))
+
+    def test_unknown_format(self):
+        self.assertIsNone(self.size_of("a.png", b"not an image"))
+        self.assertIsNone(self.size_of("b.jpg", b"\xff\xd8\xff\xd9"))
+
+
+class TestImageMetadata(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.cache_path = os.path.join(self.tmp.name, "cache", "images.json")
+        write_bytes(os.path.join(self.static, "images", "a.png"), PNG)
+        write_bytes(os.path.join(self.static, "b.gif"), GIF)
+        write_bytes(os.path.join(self.static, "index.css"), b"body {}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def scan(self):
+        images = ImageMetadata(self.static, self.cache_path)
+        images.scan()
+        return images
+
+    def test_scan_finds_images(self):
+        self.assertEqual(self.scan().sizes, {"/images/a.png": (640, 480), "/b.gif": (32, 16)})
+
+    def test_cache_reused_for_unchanged_files(self):
+        self.scan()
+        with open(self.cache_path) as file:
+            cache = json.load(file)
+        # a stale size in the cache proves the header was not read again
+        digest = cache["files"][os.path.join("images", "a.png")]["hash"]
+        cache["dimensions"][digest] = [1, 1]
+        with open(self.cache_path, "w") as file:
+            json.dump(cache, file)
+        self.assertEqual(self.scan().sizes["/images/a.png"], (1, 1))
+
+    def test_changed_file_is_read_again(self):
+        images = self.scan()
+        digest = images.digest
+        write_bytes(os.path.join(self.static, "images", "a.png"), GIF)
+        images.scan()
+        self.assertEqual(images.sizes["/images/a.png"], (32, 16))
+        self.assertNotEqual(images.digest, digest)
+
+    def test_image_props(self):
+        props = self.scan().image_props("/images/a.png")
+        self.assertEqual(props, {"width": "640", "height": "480", "loading": "lazy", "decoding": "async"})
+
+    def test_missing_image_gets_no_size(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            props = self.scan().image_props("/images/missing.png")
+        self.assertEqual(props, {"loading": "lazy", "decoding": "async"})
+        self.assertEqual(output.getvalue(), "")
+
+    def test_report(self):
+        write_bytes(os.path.join(self.static, "logo.svg"), b"<svg></svg>")
+        refs = [
+            ("content/index.md", 1, "image", "/images/a.png", "/"),
+            ("content/index.md", 2, "image", "../logo.svg", "/blog/"),
+            ("content/index.md", 3, "image", "/images/missing.png", "/"),
+            ("content/index.md", 4, "image", "/images/missing.png?v=2", "/"),
+            ("content/index.md", 5, "link", "/index.css", "/"),
+        ]
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.scan().report(linkcheck.image_urls(refs))
+        self.assertEqual(
+            output.getvalue().splitlines(),
+            [
+                "Warning: image /images/missing.png not found in " + self.static,
+                "Warning: image /logo.svg has an unsupported format, its size is left out",
+            ],
+        )
+
+    def test_external_image_not_checked(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            props = self.scan().image_props("https://example.com/a.png")
+        self.assertEqual(props, {"loading": "lazy", "decoding": "async"})
+        self.assertEqual(output.getvalue(), "")
+
+    def test_image_node_gets_size(self):
+        context = RenderContext("/blog/", images=self.scan())
+        node = text_node_to_html_node(TextNode("alt", TextType.IMAGE, "/images/a.png"), context)
+        self.assertEqual(
+            node.to_html(),
+            '<img src="/blog/images/a.png" alt="alt" width="640" height="480" loading="lazy" decoding="async"></img>',
+        )
+
+    def test_image_sizes_change_fingerprint(self):
+        before = RenderContext(images=self.scan()).fingerprint()
+        write_bytes(os.path.join(self.static, "b.gif"), PNG)
+        self.assertNotEqual(RenderContext(images=self.scan()).fingerprint(), before)
+
+if __name__ == "__main__":
+    unittest.main()
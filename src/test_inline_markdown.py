@@ -1,7 +1,10 @@
 import unittest
 
+import build_stats
+import inline_markdown
+from render_context import RenderContext
 from textnode import TextNode, TextType
-from inline_markdown import split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes
+from inline_markdown import split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_children, text_to_textnodes
 
 class TestSplitNodesDelimiter(unittest.TestCase):
     def test_split_code_delimiter(self):
@@ -483,5 +486,85 @@ class TestTextToTextNodes(unittest.TestCase):
             nodes
         )
         
+    def test_unclosed_delimiter_raises(self):
+        for text in ["an **unclosed bold", "an _unclosed italic", "an `unclosed code", "**bold** and _half"]:
+            with self.assertRaises(ValueError):
+                text_to_textnodes(text)
+                
+    def test_matches_split_pipeline(self):
+        texts = [
+            "",
+            "plain",
+            "****empty bold",
+            "**a_b** and _c`d`_ and `ef`",
+            "![img](/a.png)![img2](/b.png)[link](/c)",
+            "!![a](b) and [x ![i](u)](v) and ![alt [n](m)](p)",
+            "[one](/1) **bold** [two](/2) _it_",
+            "text ![image](https://i.imgur.com/zjjcJKZ.png) then [link](https://boot.dev) `code`",
+        ]
+        for text in texts:
+            expected = split_nodes_delimiter(
+                split_nodes_delimiter(
+                    split_nodes_delimiter(
+                        split_nodes_link(split_nodes_image([TextNode(text, TextType.TEXT)])),
+                        "**",
+                        TextType.BOLD,
+                    ),
+                    "_",
+                    TextType.ITALIC,
+                ),
+                "`",
+                TextType.CODE,
+            )
+            self.assertListEqual(expected, text_to_textnodes(text), text)
+            
+    def test_many_links(self):
+        text = " ".join(f"[link {i}](/page/{i})" for i in range(2000))
+        nodes = text_to_textnodes(text)
+        self.assertEqual(len(nodes), 3999)
+        self.assertEqual(nodes[-1], TextNode("link 1999", TextType.LINK, "/page/1999"))
+        
+class TestInlineMemo(unittest.TestCase):
+    def setUp(self):
+        build_stats.reset()
+        inline_markdown.enable_memo(2)
+
+    def tearDown(self):
+        inline_markdown.disable_memo()
+        build_stats.reset()
+
+    def render(self, text, context=None):
+        return "".join(child.to_html() for child in text_to_children(text, context))
+
+    def test_repeated_text_is_reused(self):
+        first = self.render("a **b** c")
+        self.assertEqual(self.render("a **b** c"), first)
+        self.assertEqual(build_stats.get("inline_memo_hits"), 1)
+        self.assertEqual(build_stats.get("inline_memo_misses"), 1)
+
+    def test_returned_list_is_fresh(self):
+        children = text_to_children("a **b** c")
+        children.clear()
+        self.assertEqual(self.render("a **b** c"), "a <b>b</b> c")
+
+    def test_least_recently_used_is_evicted(self):
+        for text in ("one", "two", "one", "three", "one", "two"):
+            self.render(text)
+        self.assertEqual(build_stats.get("inline_memo_hits"), 2)
+        self.assertEqual(build_stats.get("inline_memo_misses"), 4)
+
+    def test_links_are_keyed_by_context(self):
+        text = "see [home](/)"
+        self.assertEqual(self.render(text, RenderContext("/a/")), 'see <a href="/a/">home</a>')
+        self.assertEqual(self.render(text, RenderContext("/b/")), 'see <a href="/b/">home</a>')
+        self.assertEqual(build_stats.get("inline_memo_hits"), 0)
+
+    def test_relative_pages_share_text_without_links(self):
+        context = RenderContext(relative=True, output_root="docs")
+        self.render("plain _text_", context.for_page("docs/a/index.html"))
+        self.render("plain _text_", context.for_page("docs/b/index.html"))
+        self.assertEqual(build_stats.get("inline_memo_hits"), 1)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from copystatic import sync_static
+from fixtures import write_file
+from generate_page import generate_page_recursive
+from inventory import Inventory, scan_tree
+
+class TestInventory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write_file(self.template, "{{ Content }}")
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        write_file(os.path.join(self.content, "blog", "post.md"), "# Post")
+        write_file(os.path.join(self.content, "blog", "notes.txt"), "not a page")
+        write_file(os.path.join(self.content, "a", "index.md"), "# A")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.static, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan_tree_is_sorted_and_recursive(self):
+        relative_paths = [relative_path for _, relative_path in scan_tree(self.content)]
+        self.assertEqual(relative_paths, [os.path.join("a", "index.md"), os.path.join("blog", "notes.txt"), os.path.join("blog", "post.md"), "index.md"])
+
+    def test_pages_and_static_files(self):
+        inventory = Inventory(self.content, self.static, self.dest)
+        self.assertEqual(
+            [(page.relative_path, page.output_path) for page in inventory.pages],
+            [
+                (os.path.join("a", "index.md"), os.path.join(self.dest, "a", "index.html")),
+                (os.path.join("blog", "post.md"), os.path.join(self.dest, "blog", "post.html")),
+                ("index.md", os.path.join(self.dest, "index.html")),
+            ],
+        )
+        css = inventory.static[1]
+        self.assertEqual((css.relative_path, css.kind, css.size), ("index.css", "static", 7))
+        self.assertEqual(css.mtime_ns, os.stat(css.path).st_mtime_ns)
+
+    def test_stages_use_the_inventory(self):
+        inventory = Inventory(self.content, self.static, self.dest)
+        # sources added after the inventory was taken are not part of this build
+        write_file(os.path.join(self.content, "late.md"), "# Late")
+        write_file(os.path.join(self.static, "late.css"), "late")
+        sync_static(self.static, self.dest, inventory=inventory)
+        generate_page_recursive(self.content, self.template, self.dest, "/", inventory=inventory)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "blog", "post.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "images", "a.png")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "late.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "late.css")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+
+import linkcheck
+from fixtures import write_file
+from generate_page import generate_page_recursive
+from inventory import Inventory, SourceFile
+from render_context import RenderContext
+
+def urls(refs):
+    return [(ref[1], ref[2], ref[3]) for ref in refs]
+
+
+class TestCollect(unittest.TestCase):
+    def setUp(self):
+        linkcheck.enable()
+
+    def tearDown(self):
+        linkcheck.disable()
+
+    def test_collects_links_and_images_with_lines(self):
+        markdown = "<!-- layout: post.html -->\n# Title\n\n[home](/) and ![cat](/cat.png)\n\n- [post](/blog/post)"
+        linkcheck.collect_text(markdown, "content/index.md", "/")
+        self.assertEqual(
+            urls(linkcheck.refs()),
+            [(4, "link", "/"), (4, "image", "/cat.png"), (6, "link", "/blog/post")],
+        )
+
+    def test_skips_fenced_code(self):
+        markdown = "# Title\n\n```\n[code](/code)\n```\n\n[after](/after)"
+        linkcheck.collect_text(markdown, "content/index.md", "/")
+        self.assertEqual(urls(linkcheck.refs()), [(7, "link", "/after")])
+
+    def test_link_across_lines(self):
+        markdown = "# Title\n\nsee [a broken\nlink](/nope) and\n![img](/a.png)"
+        linkcheck.collect_text(markdown, "content/index.md", "/")
+        self.assertEqual(urls(linkcheck.refs()), [(4, "link", "/nope"), (5, "image", "/a.png")])
+
+    def test_inline_code_line_is_not_a_fence(self):
+        markdown = "```x``` [a](/a)\n\n```\n[code](/code)\n```"
+        linkcheck.collect_text(markdown, "content/index.md", "/")
+        self.assertEqual(urls(linkcheck.refs()), [(1, "link", "/a")])
+
+    def test_file_and_text_agree(self):
+        markdown = "<!-- layout: post.html -->\n# Title\n\n- [a](/a)\n- ![b](b.png)\n\n> [c](/c)\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.md")
+            write_file(path, markdown)
+            linkcheck.collect_file(path, "/")
+            from_file = linkcheck.drain()
+            linkcheck.collect_text(markdown, path, "/")
+            self.assertEqual(linkcheck.drain(), from_file)
+        self.assertEqual(urls(from_file), [(4, "link", "/a"), (5, "image", "b.png"), (7, "link", "/c")])
+
+
+class TestResolve(unittest.TestCase):
+    def test_target_path(self):
+        self.assertEqual(linkcheck.target_path("/", "/blog/"), "")
+        self.assertEqual(linkcheck.target_path("/blog/tom/", "/"), "blog/tom/")
+        self.assertEqual(linkcheck.target_path("../tom?x=1#top", "/blog/post/"), "blog/tom")
+        self.assertEqual(linkcheck.target_path("/images/a%20b.png", "/"), "images/a b.png")
+        for url in ("https://example.com", "mailto:me@example.com", "//cdn.example.com/a.js", "#top", ""):
+            self.assertIsNone(linkcheck.target_path(url, "/"))
+
+    def test_find_broken(self):
+        paths = {"index.html", "blog/tom/index.html", "about.html", "images/tom.png"}
+        refs = [
+            ("content/index.md", 3, "link", "/blog/tom", "/"),
+            ("content/index.md", 4, "link", "/about", "/"),
+            ("content/index.md", 5, "link", "/blog/tommy", "/"),
+            ("content/blog/tom/index.md", 2, "image", "../../images/tom.png", "/blog/tom/"),
+            ("content/blog/tom/index.md", 1, "image", "tom.png", "/blog/tom/"),
+            ("content/blog/tom/index.md", 3, "link", "https://example.com/missing", "/blog/tom/"),
+        ]
+        self.assertEqual(
+            linkcheck.find_broken(refs, paths),
+            [
+                ("content/blog/tom/index.md", 1, "image", "tom.png", "/blog/tom/"),
+                ("content/index.md", 5, "link", "/blog/tommy", "/"),
+            ],
+        )
+
+
+    def test_fingerprinted_assets(self):
+        static = [SourceFile("static/images/tom.png", os.path.join("images", "tom.png"), "static", 3, 0, "docs/images/tom.png")]
+        assets = {"/images/tom.png": "/images/tom.abc.png", "/gone.png": "/gone.def.png"}
+        paths = linkcheck.output_paths([], static, "docs", assets)
+        self.assertEqual(paths, {"images/tom.abc.png", "gone.def.png"})
+        refs = [
+            ("content/contact/index.md", 3, "image", "../images/tom.png", "/contact/"),
+            ("content/contact/index.md", 4, "image", "/images/tom.abc.png", "/contact/"),
+            ("content/contact/index.md", 5, "image", "../images/missing.png", "/contact/"),
+        ]
+        self.assertEqual(linkcheck.find_broken(refs, paths, assets), refs[2:])
+        self.assertEqual(len(linkcheck.find_broken(refs, paths)), 2)
+
+
+class TestBuildCheck(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        write_file(os.path.join(self.static, "images", "tom.png"), "png")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n[tom](/blog/tom)\n\n[gone](/blog/gone)")
+        for i in range(4):
+            write_file(os.path.join(self.content, "blog", f"post{i}", "index.md"), f"# Post {i}\n\n![tom](/images/tom.png)\n[home](../../)")
+        write_file(os.path.join(self.content, "blog", "tom", "index.md"), "# Tom\n\n![missing](/images/missing.png)")
+        linkcheck.enable()
+
+    def tearDown(self):
+        linkcheck.disable()
+        self.tmp.cleanup()
+
+    def check(self, **kwargs):
+        inventory = Inventory(self.content, self.static, self.dest)
+        context = RenderContext("/", output_root=self.dest)
+        generate_page_recursive(self.content, self.template, self.dest, "/", context=context, inventory=inventory, **kwargs)
+        paths = linkcheck.output_paths(inventory.pages, inventory.static, self.dest)
+        return [(os.path.relpath(ref[0], self.content), ref[1], ref[3]) for ref in linkcheck.find_broken(linkcheck.drain(), paths)]
+
+    def test_reports_broken_references(self):
+        expected = [(os.path.join("blog", "tom", "index.md"), 3, "/images/missing.png"), ("index.md", 5, "/blog/gone")]
+        self.assertEqual(self.check(), expected)
+        self.assertEqual(self.check(jobs=2, stream=True), expected)
+
+    def test_incremental_build_checks_unchanged_pages(self):
+        expected = self.check(incremental=True)
+        self.assertEqual(len(expected), 2)
+        self.assertEqual(self.check(incremental=True), expected)
+        # workers must not send back references the parent collected
+        for i in (0, 1):
+            write_file(os.path.join(self.content, "blog", f"post{i}", "index.md"), f"# Post {i}\n\nEdited [home](/)")
+        self.assertEqual(self.check(incremental=True, jobs=2), expected)
+
+if __name__ == "__main__":
+    unittest.main()
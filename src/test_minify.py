@@ -0,0 +1,99 @@
+import os
+import tempfile
+import time
+import unittest
+
+import build_stats
+from fixtures import write_file
+from generate_page import generate_page
+from minify import HTMLMinifier, minify_tag
+from render_context import RenderContext
+
+def minify(*chunks):
+    parts = []
+    minifier = HTMLMinifier(parts.append)
+    for chunk in chunks:
+        minifier.write(chunk)
+    minifier.close()
+    return "".join(parts)
+
+class TestMinify(unittest.TestCase):
+    def test_collapses_whitespace_between_blocks(self):
+        self.assertEqual(minify("<div>\n  <p>a   b</p>\n</div>\n"), "<div><p>a b</p></div>")
+
+    def test_keeps_space_between_inline_tags(self):
+        self.assertEqual(minify("<p><b>a</b>\n  <i>b</i></p>"), "<p><b>a</b> <i>b</i></p>")
+
+    def test_drops_comments(self):
+        self.assertEqual(minify("<p>a<!-- note -->b</p>"), "<p>ab</p>")
+
+    def test_pre_and_code_untouched(self):
+        html = "<pre><code>def f():\n    return  1\n</code></pre><p><code>a  b</code></p>"
+        self.assertEqual(minify(html), html)
+
+    def test_chunk_boundaries_do_not_matter(self):
+        html = '<div>\n  <p class="x">hello   world</p><!-- c --><pre>a\n  b</pre>\n</div>'
+        expected = minify(html)
+        self.assertEqual(minify(*html), expected)
+        self.assertEqual(minify(html[:9], html[9:30], html[30:]), expected)
+
+    def test_text_with_angle_bracket(self):
+        self.assertEqual(minify('<a href="/a">< Back</a>'), '<a href=/a>< Back</a>')
+
+    def test_minify_tag_quotes(self):
+        self.assertEqual(minify_tag('<img src="/a.png" alt="">'), '<img src=/a.png alt="">')
+        self.assertEqual(minify_tag('<a title="a b" href="/x/">'), '<a title="a b" href="/x/">')
+        self.assertEqual(minify_tag('<meta charset="utf-8" />'), "<meta charset=utf-8 />")
+        self.assertEqual(minify_tag("<p title='say \"hi\"'>"), "<p title='say \"hi\"'>")
+
+    def test_large_single_write_is_linear(self):
+        # a whole buffered page arrives in one write(); rescanning the rest of
+        # it per tag took minutes at this size
+        block = '<div>\n  <p class="x">some   text <b>bold</b></p>\n<pre><code>a  b\n</code></pre><!-- c -->\n</div>\n'
+        html = block * 40000
+        start = time.perf_counter()
+        result = minify(html)
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual(result, minify(block) * 40000)
+
+    def test_counts_bytes(self):
+        parts = []
+        minifier = HTMLMinifier(parts.append)
+        minifier.write("<p>  é  </p>")
+        minifier.close()
+        self.assertEqual(minifier.bytes_in, 13)
+        self.assertEqual(minifier.bytes_out, len("".join(parts).encode()))
+
+
+class TestGeneratePageMinify(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "content", "index.md")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write_file(self.source, "# Hi\n\nSome   text\n\n```\nx  =  1\n```")
+        write_file(self.template, "<html>\n  <title>{{ Title }}</title>\n  <body>\n    {{ Content }}\n  </body>\n</html>\n")
+        build_stats.reset()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        build_stats.reset()
+
+    def render(self, stream):
+        dest = os.path.join(self.tmp.name, "docs", "index.html")
+        context = RenderContext(output_root=os.path.join(self.tmp.name, "docs"), minify=True)
+        generate_page(self.source, self.template, dest, "/", stream=stream, context=context)
+        with open(dest) as file:
+            return file.read()
+
+    def test_stream_and_buffered_output_match(self):
+        html = self.render(False)
+        self.assertEqual(html, self.render(True))
+        self.assertIn("<pre><code>x  =  1\n</code></pre>", html)
+        self.assertTrue(html.startswith("<html><title>Hi</title><body><div><h1>Hi</h1><p>Some text</p>"))
+
+    def test_records_bytes_saved(self):
+        self.render(False)
+        self.assertGreater(build_stats.get("minify_bytes_in"), build_stats.get("minify_bytes_out"))
+
+if __name__ == "__main__":
+    unittest.main()
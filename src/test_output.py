@@ -0,0 +1,79 @@
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from copystatic import copy_static
+from fixtures import read_bytes, write_file
+from generate_page import generate_page_recursive
+from output import ArchiveOutput, MemoryOutput
+
+class TestOutputBackends(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n[post](/blog/post/)")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nText é")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, output=None, stream=False):
+        copy_static(self.static, self.dest, output=output)
+        generate_page_recursive(self.content, self.template, self.dest, "/base/", stream=stream, output=output)
+        if output is not None:
+            output.close()
+
+    def build_archive(self, name, stream=False):
+        path = os.path.join(self.tmp.name, name)
+        self.build(ArchiveOutput(path), stream)
+        return path
+
+    def test_memory_output_matches_filesystem(self):
+        self.build()
+        output = MemoryOutput()
+        self.build(output)
+        self.assertEqual(sorted(output.files), ["blog/post/index.html", "index.css", "index.html"])
+        for name, data in output.files.items():
+            self.assertEqual(data, read_bytes(os.path.join(self.dest, name)))
+
+    def test_backend_leaves_destination_alone(self):
+        self.build(MemoryOutput())
+        self.assertFalse(os.path.exists(self.dest))
+
+    def test_tar_archive(self):
+        output = MemoryOutput()
+        self.build(output)
+        with tarfile.open(self.build_archive("site.tar")) as tar:
+            members = tar.getmembers()
+            self.assertEqual([member.name for member in members], ["index.css", "blog/post/index.html", "index.html"])
+            self.assertEqual({(member.mtime, member.mode, member.uid) for member in members}, {(315532800, 0o644, 0)})
+            for member in members:
+                self.assertEqual(tar.extractfile(member).read(), output.files[member.name])
+
+    def test_zip_archive_with_streamed_pages(self):
+        output = MemoryOutput()
+        self.build(output)
+        with zipfile.ZipFile(self.build_archive("site.zip", stream=True)) as archive:
+            self.assertEqual(archive.namelist(), ["index.css", "blog/post/index.html", "index.html"])
+            for name in archive.namelist():
+                self.assertEqual(archive.read(name), output.files[name])
+
+    def test_archives_are_reproducible(self):
+        for name in ("site.tar.gz", "site.zip"):
+            first = read_bytes(self.build_archive(name))
+            os.utime(os.path.join(self.static, "index.css"), (1, 1))
+            self.assertEqual(read_bytes(self.build_archive(name)), first)
+
+    def test_unknown_archive_type(self):
+        with self.assertRaises(ValueError):
+            ArchiveOutput(os.path.join(self.tmp.name, "site.rar"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+import parse_cache
+from markdown_blocks import markdown_to_html_node
+from parse_cache import ParseCache, data_to_node, node_to_data
+
+MARKDOWN = "# Title\n\nSome **bold** and a [link](/a)\n\n- one\n- two\n\n```\ncode\n```"
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(os.path.join(self.tmp.name, "cache"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        parse_cache._parser_version = None
+
+    def test_round_trip(self):
+        node = markdown_to_html_node(MARKDOWN)
+        self.assertEqual(data_to_node(node_to_data(node)).to_html(), node.to_html())
+
+    def test_get_miss_then_hit(self):
+        self.assertIsNone(self.cache.get(MARKDOWN))
+        node = markdown_to_html_node(MARKDOWN)
+        self.cache.put(MARKDOWN, node)
+        self.assertEqual(self.cache.get(MARKDOWN).to_html(), node.to_html())
+
+    def test_parser_change_invalidates(self):
+        self.cache.put(MARKDOWN, markdown_to_html_node(MARKDOWN))
+        parse_cache._parser_version = "edited parser"
+        self.assertIsNone(self.cache.get(MARKDOWN))
+
+    def test_corrupt_entry_is_dropped(self):
+        self.cache.put(MARKDOWN, markdown_to_html_node(MARKDOWN))
+        path = self.cache.entry_path(self.cache.key(MARKDOWN))
+        with open(path, "wb") as file:
+            file.write(b"\x00")
+        self.assertIsNone(self.cache.get(MARKDOWN))
+        self.assertFalse(os.path.exists(path))
+
+    def test_evict_least_recently_used(self):
+        documents = [f"# Page {i}\n\n" + "text " * 200 for i in range(3)]
+        for i, markdown in enumerate(documents):
+            self.cache.put(markdown, markdown_to_html_node(markdown))
+            path = self.cache.entry_path(self.cache.key(markdown))
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+        entry_size = os.path.getsize(self.cache.entry_path(self.cache.key(documents[0])))
+        self.cache.max_bytes = entry_size * 2 + entry_size // 2
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertIsNone(self.cache.get(documents[0]))
+        self.assertIsNotNone(self.cache.get(documents[2]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+
+import profiler
+
+class TestProfiler(unittest.TestCase):
+    def tearDown(self):
+        profiler.disable()
+
+    def test_span_is_shared_noop_when_disabled(self):
+        self.assertIs(profiler.span("parse", "a.md"), profiler.NULL_SPAN)
+        self.assertFalse(profiler.is_enabled())
+
+    def test_span_records_events(self):
+        profiler.enable()
+        with profiler.span("parse", "a.md"):
+            pass
+        with profiler.span("build"):
+            pass
+        events = profiler.events()
+        self.assertEqual([(name, page) for name, page, *_ in events], [("parse", "a.md"), ("build", None)])
+        self.assertTrue(all(duration >= 0 for _, _, _, duration, _, _ in events))
+
+    def test_drain_and_extend(self):
+        profiler.enable()
+        with profiler.span("parse", "a.md"):
+            pass
+        drained = profiler.drain()
+        self.assertEqual(profiler.events(), [])
+        profiler.extend(drained)
+        self.assertEqual(len(profiler.events()), 1)
+
+    def test_summarize(self):
+        events = [
+            ("parse", "a.md", 0, 5, 1, 1),
+            ("write", "a.md", 5, 1, 1, 1),
+            ("parse", "b.md", 0, 9, 1, 1),
+            ("pages", None, 0, 20, 1, 1),
+        ]
+        summary = profiler.summarize(events, top=1)
+        self.assertEqual(summary["stages"], [("pages", 20), ("parse", 14), ("write", 1)])
+        self.assertEqual(summary["pages"], [("b.md", 9)])
+
+    def test_write_trace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            profiler.write_trace(path, [("parse", "a.md", 2000, 3000, 7, 8)])
+            with open(path) as file:
+                trace = json.load(file)
+        self.assertEqual(
+            trace["traceEvents"],
+            [{"name": "parse", "cat": "build", "ph": "X", "ts": 2.0, "dur": 3.0, "pid": 7, "tid": 8, "args": {"page": "a.md"}}],
+        )
+
+if __name__ == "__main__":
+    unittest.main()
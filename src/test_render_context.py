@@ -0,0 +1,70 @@
+import os
+import unittest
+
+from markdown_blocks import markdown_to_html_node
+from render_context import RenderContext, relative_url
+
+class TestRenderContext(unittest.TestCase):
+    def test_basepath_prefix(self):
+        context = RenderContext("/site/")
+        self.assertEqual(context.resolve_url("/blog/tom"), "/site/blog/tom")
+        self.assertEqual(context.resolve_url("/"), "/site/")
+
+    def test_non_root_urls_untouched(self):
+        context = RenderContext("/site/")
+        for url in ("https://boot.dev", "//cdn.example.com/a.js", "images/a.png", "#top", "mailto:a@b.c"):
+            self.assertEqual(context.resolve_url(url), url)
+
+    def test_for_page(self):
+        context = RenderContext("/", relative=True, output_root="docs")
+        self.assertEqual(context.for_page(os.path.join("docs", "index.html")).page_dir, "/")
+        self.assertEqual(context.for_page(os.path.join("docs", "blog", "tom", "index.html")).page_dir, "/blog/tom/")
+        self.assertEqual(context.page_dir, "/")
+
+    def test_relative_urls(self):
+        context = RenderContext(relative=True).for_page(os.path.join("docs", "blog", "tom", "index.html"))
+        self.assertEqual(context.resolve_url("/index.css"), "../../index.css")
+        self.assertEqual(context.resolve_url("/"), "../../")
+        self.assertEqual(context.resolve_url("/blog/majesty"), "../majesty")
+
+    def test_relative_url_keeps_query_and_fragment(self):
+        self.assertEqual(relative_url("/blog/tom?x=1#top", "/"), "blog/tom?x=1#top")
+        self.assertEqual(relative_url("/#top", "/blog/"), "../#top")
+        self.assertEqual(relative_url("/blog/", "/blog/"), "./")
+
+    def test_cache_key(self):
+        page = os.path.join("docs", "blog", "index.html")
+        self.assertEqual(RenderContext("/a/").for_page(page).cache_key(), "basepath=/a/")
+        self.assertEqual(RenderContext(relative=True).for_page(page).cache_key(), "relative:/blog/")
+
+    def test_assets_are_fingerprinted(self):
+        context = RenderContext("/site/", assets={"/index.css": "/index.abc.css"})
+        self.assertEqual(context.resolve_url("/index.css?v=1"), "/site/index.abc.css?v=1")
+        self.assertEqual(context.resolve_url("/other.css"), "/site/other.css")
+        self.assertNotEqual(context.fingerprint(), RenderContext("/site/").fingerprint())
+
+    def test_relative_asset_references_are_fingerprinted(self):
+        assets = {"/images/tom.png": "/images/tom.abc.png"}
+        context = RenderContext("/site/", assets=assets).for_page(os.path.join("docs", "contact", "index.html"))
+        self.assertEqual(context.resolve_url("../images/tom.png?v=1"), "../images/tom.abc.png?v=1")
+        self.assertEqual(context.resolve_url("../images/other.png"), "../images/other.png")
+        self.assertEqual(context.resolve_url("#top"), "#top")
+        self.assertEqual(context.resolve_url("mailto:a@b.c"), "mailto:a@b.c")
+        self.assertEqual(context.cache_key(), f"{context.fingerprint()}:/contact/")
+
+    def test_page_keys_follow_assigned_assets(self):
+        page = os.path.join("docs", "index.html")
+        context = RenderContext("/", assets={"/a.css": "/a.1.css"})
+        first = context.for_page(page).page_key
+        context.assets = {"/a.css": "/a.2.css"}
+        self.assertNotEqual(context.for_page(page).page_key, first)
+        context.assets = {"/a.css": "/a.1.css"}
+        self.assertEqual(context.for_page(page).page_key, first)
+
+    def test_code_block_urls_not_rewritten(self):
+        md = '[home](/)\n\n```\n<a href="/x">x</a>\n```'
+        html = markdown_to_html_node(md, context=RenderContext("/site/")).to_html()
+        self.assertEqual(html, '<div><p><a href="/site/">home</a></p><pre><code><a href="/x">x</a>\n</code></pre></div>')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+from markdown_blocks import BlockType, markdown_to_blocks, markdown_to_html_node, scan_blocks, write_markdown_html
+
+class TestScanBlocks(unittest.TestCase):
+    def test_scan_blocks_types_and_lines(self):
+        md = "# Heading\n\n- item1\n- item2\n\n  Paragraph\nline two  \n\n> quote"
+        self.assertEqual(
+            list(scan_blocks(md.split("\n"))),
+            [
+                (BlockType.HEADING, ["# Heading"]),
+                (BlockType.ULIST, ["- item1", "- item2"]),
+                (BlockType.PARAGRAPH, ["Paragraph", "line two"]),
+                (BlockType.QUOTE, ["> quote"]),
+            ],
+        )
+
+    def test_scan_blocks_accepts_any_iterable(self):
+        lines = iter(["# Title", "", "text"])
+        self.assertEqual(
+            [block_type for block_type, _ in scan_blocks(lines)],
+            [BlockType.HEADING, BlockType.PARAGRAPH],
+        )
+
+    def test_write_markdown_html_matches_tree(self):
+        md = "# Title\n\n- a\n- **b**\n\n```\ncode\n```\n\n> quote"
+        parts = []
+        write_markdown_html(iter(md.split("\n")), parts.append)
+        self.assertEqual("".join(parts), markdown_to_html_node(md).to_html())
+
+    def test_whitespace_only_line_does_not_split_block(self):
+        self.assertEqual(markdown_to_blocks("a\n   \nb"), ["a\n   \nb"])
+
+    def test_fenced_code_keeps_blank_lines(self):
+        md = "```\nfirst\n\n\nsecond\n```\n\nafter"
+        self.assertEqual(markdown_to_blocks(md), ["```\nfirst\n\n\nsecond\n```", "after"])
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><pre><code>first\n\n\nsecond\n</code></pre><p>after</p></div>",
+        )
+
+    def test_fence_ends_block(self):
+        md = "```\ncode\n```\ntext right after"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><pre><code>code\n</code></pre><p>text right after</p></div>",
+        )
+
+    def test_unclosed_fence_is_plain_text(self):
+        md = "```\n\nparagraph"
+        self.assertEqual(markdown_to_blocks(md), ["```", "paragraph"])
+
+    def test_inline_code_does_not_open_fence(self):
+        md = "```x``` text\n\nnext para\n\n```python\nreal code\n```\n\nend"
+        self.assertEqual(
+            [block_type for block_type, _ in scan_blocks(md.split("\n"))],
+            [BlockType.PARAGRAPH, BlockType.PARAGRAPH, BlockType.CODE, BlockType.PARAGRAPH],
+        )
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p><code>x</code> text</p><p>next para</p><pre><code>real code\n</code></pre><p>end</p></div>",
+        )
+        self.assertEqual(
+            markdown_to_html_node("```x```\n\nnext para\n\n```\nreal code\n```\n\nend").to_html(),
+            "<div><p><code>x</code></p><p>next para</p><pre><code>real code\n</code></pre><p>end</p></div>",
+        )
+
+    def test_info_string_does_not_close_fence(self):
+        md = "# Nested\n\n```markdown\n```python\nprint(1)\n```\n\nafter"
+        self.assertEqual(
+            list(scan_blocks(md.split("\n"))),
+            [
+                (BlockType.HEADING, ["# Nested"]),
+                (BlockType.CODE, ["```markdown", "```python", "print(1)", "```"]),
+                (BlockType.PARAGRAPH, ["after"]),
+            ],
+        )
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><h1>Nested</h1><pre><code>```python\nprint(1)\n</code></pre><p>after</p></div>",
+        )
+
+    def test_multiline_heading(self):
+        self.assertEqual(
+            markdown_to_html_node("## Heading\ncontinued").to_html(),
+            "<div><h2>Heading\ncontinued</h2></div>",
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from fixtures import read_tree, write_file
+from inventory import SourceFile
+from shard import check_shards, pages_digest, parse_shard, partition
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+def make_pages(sizes):
+    return [SourceFile(f"content/p{i}.md", f"p{i}.md", "page", size, 0, f"docs/p{i}.html") for i, size in enumerate(sizes)]
+
+
+class TestPartition(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for spec in ("0/4", "5/4", "1-4", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_partition_covers_every_page_once(self):
+        pages = make_pages([10] * 50)
+        for weighted in (False, True):
+            shards = partition(pages, 3, weighted)
+            paths = sorted(page.relative_path for shard in shards for page in shard)
+            self.assertEqual(paths, sorted(page.relative_path for page in pages))
+
+    def test_partition_is_stable(self):
+        pages = make_pages([10] * 20)
+        first = [[page.relative_path for page in shard] for shard in partition(pages, 4)]
+        again = [[page.relative_path for page in shard] for shard in partition(list(reversed(pages)), 4)]
+        self.assertEqual([sorted(shard) for shard in first], [sorted(shard) for shard in again])
+
+    def test_weighted_partition_balances_size(self):
+        pages = make_pages([50, 40, 30, 30, 20, 10])
+        loads = [sum(page.size for page in shard) for shard in partition(pages, 2, weighted=True)]
+        self.assertEqual(loads, [90, 90])
+
+    def test_check_shards_reports_problems(self):
+        pages = make_pages([1, 1, 1])
+        digest = pages_digest(pages)
+        manifests = [
+            {"shard": 1, "count": 3, "pages_digest": digest, "pages": {"p0.md": "p0.html", "p1.md": "p1.html"}},
+            {"shard": 2, "count": 3, "pages_digest": digest, "pages": {"p1.md": "p1.html"}},
+        ]
+        self.assertEqual(
+            check_shards(manifests, pages),
+            [
+                "shard 3/3 is missing",
+                "page p1.html rendered by shards 1 and 2",
+                "page p2.md was not rendered by any shard",
+            ],
+        )
+
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.site = self.tmp.name
+        write_file(os.path.join(self.site, "template.html"), "<title>{{ Title }}</title>{{ Content }}")
+        write_file(os.path.join(self.site, "static", "index.css"), "body {}")
+        for i in range(8):
+            write_file(os.path.join(self.site, "content", "blog", f"post{i}", "index.md"), f"# Post {i}\n\n[home](/) and text")
+        write_file(os.path.join(self.site, "content", "index.md"), "# Home")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_main(self, *args):
+        return subprocess.run([sys.executable, MAIN, *args], cwd=self.site, capture_output=True, text=True)
+
+    def test_shards_merge_into_full_build(self):
+        self.assertEqual(self.run_main("/base/").returncode, 0)
+        expected = read_tree(os.path.join(self.site, "docs"))
+        shards = [subprocess.Popen([sys.executable, MAIN, "--shard", f"{i}/3", "/base/"], cwd=self.site, stdout=subprocess.DEVNULL) for i in (1, 2, 3)]
+        self.assertEqual([process.wait() for process in shards], [0, 0, 0])
+        result = self.run_main("--merge-shards")
+        self.assertEqual(result.returncode, 0, result.stdout)
+        self.assertEqual(read_tree(os.path.join(self.site, "docs")), expected)
+
+    def test_merge_refuses_missing_shard(self):
+        self.run_main("/base/")
+        before = read_tree(os.path.join(self.site, "docs"))
+        self.run_main("--shard", "1/2", "--shard-weighted")
+        result = self.run_main("--merge-shards")
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("shard 2/2 is missing", result.stdout)
+        self.assertEqual(read_tree(os.path.join(self.site, "docs")), before)
+
+if __name__ == "__main__":
+    unittest.main()
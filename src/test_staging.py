@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import build_stats
+from fixtures import read_file, write_file
+from staging import atomic_copy, atomic_open, link_tree, prepare_staging, swap_output, write_if_changed
+
+class TestAtomicWrites(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index.html")
+        write_file(self.path, "old")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_atomic_open_replaces_file(self):
+        with atomic_open(self.path) as file:
+            file.write("new")
+        self.assertEqual(read_file(self.path), "new")
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_failed_write_keeps_old_file(self):
+        with self.assertRaises(RuntimeError):
+            with atomic_open(self.path) as file:
+                file.write("half")
+                raise RuntimeError("render failed")
+        self.assertEqual(read_file(self.path), "old")
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_skip_unchanged_keeps_file(self):
+        os.utime(self.path, ns=(10**9, 10**9))
+        with atomic_open(self.path, skip_unchanged=True) as file:
+            file.write("old")
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 10**9)
+        with atomic_open(self.path, skip_unchanged=True) as file:
+            file.write("new")
+        self.assertEqual(read_file(self.path), "new")
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_write_if_changed_compares_before_writing(self):
+        os.utime(self.path, ns=(10**9, 10**9))
+        build_stats.reset()
+        with mock.patch("staging.os.replace") as replace:
+            write_if_changed(self.path, "old")
+        replace.assert_not_called()
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 10**9)
+        write_if_changed(self.path, "new é")
+        self.assertEqual(read_file(self.path), "new é")
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html"])
+        self.assertEqual(build_stats.drain(), {"outputs_unchanged": 1, "outputs_written": 1})
+
+    def test_writes_do_not_change_hardlinks(self):
+        link = os.path.join(self.tmp.name, "link.html")
+        os.link(self.path, link)
+        with atomic_open(link) as file:
+            file.write("new")
+        source = os.path.join(self.tmp.name, "source.html")
+        write_file(source, "copied")
+        atomic_copy(source, link)
+        self.assertEqual(read_file(self.path), "old")
+        self.assertEqual(read_file(link), "copied")
+
+
+class TestStaging(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "docs")
+        write_file(os.path.join(self.output, "index.html"), "home")
+        write_file(os.path.join(self.output, "blog", "index.html"), "blog")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_link_tree_shares_files(self):
+        clone = os.path.join(self.tmp.name, "clone")
+        self.assertEqual(link_tree(self.output, clone), 2)
+        self.assertTrue(os.path.samefile(os.path.join(self.output, "blog", "index.html"), os.path.join(clone, "blog", "index.html")))
+
+    def test_staged_build_leaves_output_alone_until_swap(self):
+        staging = prepare_staging(self.output, link=True)
+        with atomic_open(os.path.join(staging, "index.html")) as file:
+            file.write("new home")
+        self.assertEqual(read_file(os.path.join(self.output, "index.html")), "home")
+        swap_output(staging, self.output)
+        self.assertEqual(read_file(os.path.join(self.output, "index.html")), "new home")
+        self.assertEqual(read_file(os.path.join(self.output, "blog", "index.html")), "blog")
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["docs"])
+
+    def test_unlinked_staging_starts_empty(self):
+        staging = prepare_staging(self.output)
+        self.assertEqual(os.listdir(staging), [])
+
+    def test_leftover_staging_is_cleared(self):
+        write_file(os.path.join(self.output + ".staging", "stale.html"), "stale")
+        staging = prepare_staging(self.output, link=True)
+        self.assertFalse(os.path.exists(os.path.join(staging, "stale.html")))
+
+    def test_swap_without_previous_output(self):
+        staging = prepare_staging(os.path.join(self.tmp.name, "site"))
+        write_file(os.path.join(staging, "index.html"), "first")
+        swap_output(staging, os.path.join(self.tmp.name, "site"))
+        self.assertEqual(read_file(os.path.join(self.tmp.name, "site", "index.html")), "first")
+
+if __name__ == "__main__":
+    unittest.main()
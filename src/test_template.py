@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from fixtures import write_file
+from render_context import RenderContext
+from template import clear_template_cache, compile_template, extract_layout, load_template
+
+class TestTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.template = os.path.join(self.tmp.name, "template.html")
+        clear_template_cache()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compile_splits_literals_and_fields(self):
+        write_file(self.template, "<title>{{ Title }}</title><article>{{ Content }}</article>")
+        template = compile_template(self.template)
+        self.assertEqual(template.segments, ["<title>", "", "</title><article>", "", "</article>"])
+        self.assertEqual(template.fields, [(1, "Title"), (3, "Content")])
+
+    def test_render(self):
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}{{ Title }}")
+        template = compile_template(self.template)
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": "<p>body</p>"}),
+            "<title>Hi</title><p>body</p>Hi",
+        )
+
+    def test_write_streams_fields(self):
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        template = compile_template(self.template)
+        parts = []
+        template.write(parts.append, {"Title": "Hi", "Content": lambda write: write("<p>streamed</p>")})
+        self.assertEqual("".join(parts), template.render({"Title": "Hi", "Content": "<p>streamed</p>"}))
+
+    def test_unknown_placeholder_left_as_text(self):
+        write_file(self.template, "{{ Unknown }}{{ Content }}")
+        template = compile_template(self.template)
+        self.assertEqual(template.render({"Content": "x"}), "{{ Unknown }}x")
+
+    def test_urls_resolved_by_context(self):
+        write_file(self.template, '<link href="/index.css" /><img src="/a.png" /><a href="https://x.y/">{{ Content }}</a>')
+        template = compile_template(self.template)
+        self.assertEqual(template.urls, [(1, "/index.css"), (3, "/a.png")])
+        self.assertEqual(
+            template.render({"Content": ""}, RenderContext("/site/")),
+            '<link href="/site/index.css" /><img src="/site/a.png" /><a href="https://x.y/"></a>',
+        )
+        self.assertEqual(
+            template.render({"Content": ""}),
+            '<link href="/index.css" /><img src="/a.png" /><a href="https://x.y/"></a>',
+        )
+
+    def test_write_resolves_urls(self):
+        write_file(self.template, '<link href="/index.css" />{{ Content }}')
+        template = compile_template(self.template)
+        parts = []
+        template.write(parts.append, {"Content": "x"}, RenderContext("/site/"))
+        self.assertEqual("".join(parts), '<link href="/site/index.css" />x')
+
+    def test_partials(self):
+        write_file(os.path.join(self.tmp.name, "footer.html"), "<footer>{{ Title }}</footer>")
+        write_file(self.template, "<main>{{ Content }}</main>{{> footer.html }}")
+        template = compile_template(self.template)
+        self.assertEqual(
+            template.render({"Title": "T", "Content": "C"}),
+            "<main>C</main><footer>T</footer>",
+        )
+        self.assertEqual(len(template.dependencies), 2)
+
+    def test_partial_cycle(self):
+        write_file(self.template, "{{> template.html }}")
+        with self.assertRaises(ValueError):
+            compile_template(self.template)
+
+    def test_load_template_is_cached(self):
+        write_file(self.template, "{{ Content }}")
+        template = load_template(self.template)
+        self.assertIs(template, load_template(self.template))
+        clear_template_cache()
+        self.assertIsNot(template, load_template(self.template))
+
+    def test_extract_layout(self):
+        self.assertEqual(
+            extract_layout("<!-- layout: post.html -->\n# Title"),
+            ("post.html", "# Title"),
+        )
+        self.assertEqual(extract_layout("# Title"), (None, "# Title"))
+
+if __name__ == "__main__":
+    unittest.main()
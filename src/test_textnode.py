@@ -36,5 +36,15 @@ class TestTextNode(unittest.TestCase):
         node2= TextNode("This is anchor text", TextType.LINK, "https://boot.dev")
         self.assertEqual(node, node2)
     
+    def test_no_instance_dict(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+            
+    def test_repr(self):
+        node = TextNode("anchor", TextType.LINK, "https://boot.dev")
+        self.assertEqual(repr(node), "TextNode(anchor, link, https://boot.dev)")
+    
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from fixtures import read_file, write_file
+from generate_page import generate_page_recursive
+from watch import changed_paths, rebuild, take_snapshot
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write_file(self.template, "<main>{{ Content }}</main>")
+        write_file(os.path.join(self.tmp.name, "post.html"), "<article>{{ Content }}</article>")
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        write_file(os.path.join(self.content, "post", "index.md"), "<!-- layout: post.html -->\n# Post")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        generate_page_recursive(self.content, self.template, self.dest, "/")
+        self.snapshot = take_snapshot(self.content, self.static, self.template)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def apply_changes(self):
+        current = take_snapshot(self.content, self.static, self.template)
+        changed = changed_paths(self.snapshot, current)
+        rebuild(changed, current, self.content, self.static, self.template, self.dest, "/")
+        self.snapshot = current
+        return changed
+
+    def test_changed_paths(self):
+        previous = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        current = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual(changed_paths(previous, current), {"b", "c", "d"})
+
+    def test_rebuilds_only_changed_page(self):
+        post_html = os.path.join(self.dest, "post", "index.html")
+        write_file(post_html, "untouched")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nedited")
+        self.apply_changes()
+        self.assertEqual(read_file(os.path.join(self.dest, "index.html")), "<main><div><h1>Home</h1><p>edited</p></div></main>")
+        self.assertEqual(read_file(post_html), "untouched")
+
+    def test_layout_change_rebuilds_pages_using_it(self):
+        index_html = os.path.join(self.dest, "index.html")
+        write_file(index_html, "untouched")
+        write_file(os.path.join(self.tmp.name, "post.html"), "<aside>{{ Content }}</aside>")
+        self.apply_changes()
+        self.assertEqual(read_file(index_html), "untouched")
+        self.assertEqual(read_file(os.path.join(self.dest, "post", "index.html")), "<aside><div><h1>Post</h1></div></aside>")
+
+    def test_deleted_page_removes_output(self):
+        os.remove(os.path.join(self.content, "post", "index.md"))
+        self.apply_changes()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "post")))
+
+    def test_static_change_is_copied(self):
+        write_file(os.path.join(self.static, "index.css"), "body { color: red }")
+        self.apply_changes()
+        self.assertEqual(read_file(os.path.join(self.dest, "index.css")), "body { color: red }")
+
+if __name__ == "__main__":
+    unittest.main()
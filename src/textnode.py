@@ -12,6 +12,8 @@ class TextType(Enum):
     
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+    
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -29,7 +31,7 @@ class TextNode:
     
     
     
-def text_node_to_html_node(text_node):
+def text_node_to_html_node(text_node, context=None):
     match text_node.text_type:
         case TextType.TEXT:
             return LeafNode(None, text_node.text)
@@ -40,8 +42,13 @@ def text_node_to_html_node(text_node):
         case TextType.CODE:
             return LeafNode("code", text_node.text)
         case TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
+            url = text_node.url if context is None else context.resolve_url(text_node.url)
+            return LeafNode("a", text_node.text, {"href": url})
         case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            url = text_node.url if context is None else context.resolve_url(text_node.url)
+            props = {"src": url, "alt": text_node.text}
+            if context is not None and context.images is not None:
+                props.update(context.images.image_props(text_node.url))
+            return LeafNode("img", "", props)
         case _:
             raise ValueError(f"Invalid text type: {text_node.text_type}")
\ No newline at end of file
@@ -0,0 +1,136 @@
+import functools
+import http.server
+import os
+import threading
+import time
+import traceback
+from pathlib import Path
+
+import linkcheck
+from copystatic import sync_static
+from generate_page import generate_page, generate_page_recursive, read_layout
+from inventory import scan_tree
+from manifest import remove_output
+from render_context import RenderContext
+from template import clear_template_cache, load_template, resolve_layout
+
+def watch(content_dir, static_dir, template_path, dest_dir, basepath, port=8888, interval=0.1, context=None):
+    if context is None:
+        context = RenderContext(basepath, output_root=dest_dir)
+    if context.images is not None:
+        context.images.scan()
+        linkcheck.enable()
+    sync_static(static_dir, dest_dir)
+    generate_page_recursive(content_dir, template_path, dest_dir, basepath, incremental=True, context=context)
+    report_images(context)
+
+    server = serve(dest_dir, port)
+    print(f"Serving {dest_dir} on http://localhost:{server.server_address[1]}/ - watching for changes, Ctrl+C to stop")
+
+    snapshot = take_snapshot(content_dir, static_dir, template_path)
+    try:
+        while True:
+            time.sleep(interval)
+            current = take_snapshot(content_dir, static_dir, template_path)
+            if current == snapshot:
+                continue
+            changed = changed_paths(snapshot, current)
+            snapshot = current
+            try:
+                rebuild(changed, current, content_dir, static_dir, template_path, dest_dir, basepath, context)
+            except Exception:
+                # keep the watcher alive on a bad edit; the next save retries
+                traceback.print_exc()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+def serve(dest_dir, port):
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=dest_dir)
+    server = http.server.ThreadingHTTPServer(("", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def take_snapshot(content_dir, static_dir, template_path) -> dict:
+    snapshot = {}
+    for root in (content_dir, static_dir):
+        if not os.path.isdir(root):
+            continue
+        for entry, _ in scan_tree(root):
+            add_to_snapshot(snapshot, entry.path)
+    # layouts and partials live next to the main template
+    template_dir = os.path.dirname(template_path) or "."
+    for filename in os.listdir(template_dir):
+        if filename.endswith(".html"):
+            add_to_snapshot(snapshot, os.path.join(template_dir, filename))
+    return snapshot
+
+def add_to_snapshot(snapshot, path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return
+    snapshot[os.path.normpath(path)] = (stat.st_mtime_ns, stat.st_size)
+
+def changed_paths(previous, current) -> set:
+    changed = {path for path, state in current.items() if previous.get(path) != state}
+    return changed | (previous.keys() - current.keys())
+
+def rebuild(changed, snapshot, content_dir, static_dir, template_path, dest_dir, basepath, context=None):
+    start = time.perf_counter()
+    content_root = os.path.normpath(content_dir)
+    static_root = os.path.normpath(static_dir)
+    pages = set()
+    templates = set()
+    static_changed = False
+
+    for path in changed:
+        if is_within(path, content_root):
+            if path.endswith(".md"):
+                pages.add(path)
+        elif is_within(path, static_root):
+            static_changed = True
+        elif path.endswith(".html"):
+            templates.add(path)
+
+    if static_changed:
+        sync_static(static_dir, dest_dir)
+        if context is not None and context.images is not None:
+            context.images.scan()
+
+    if templates:
+        clear_template_cache()
+        pages |= pages_using_templates(templates, snapshot, content_root, template_path)
+
+    for source_path in sorted(pages):
+        relative_path = Path(os.path.relpath(source_path, content_root)).with_suffix(".html")
+        if source_path in snapshot:
+            generate_page(source_path, template_path, str(Path(dest_dir) / relative_path), basepath, context=context)
+        else:
+            print(f"Removing {Path(dest_dir) / relative_path} (source deleted)")
+            remove_output(dest_dir, str(relative_path))
+    report_images(context)
+
+    print(f"Rebuilt {len(pages)} page(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+def report_images(context):
+    # image warnings for the pages rendered since the last call
+    if context is not None and context.images is not None:
+        context.images.report(linkcheck.image_urls(linkcheck.drain()))
+
+def pages_using_templates(templates, snapshot, content_root, template_path) -> set:
+    pages = set()
+    for path in snapshot:
+        if not (path.endswith(".md") and is_within(path, content_root)):
+            continue
+        page_template = resolve_layout(template_path, read_layout(path))
+        if not os.path.exists(page_template):
+            continue
+        dependencies = {os.path.normpath(dependency) for dependency in load_template(page_template).dependencies}
+        if dependencies & templates:
+            pages.add(path)
+    return pages
+
+def is_within(path, root) -> bool:
+    return path == root or path.startswith(root + os.sep)